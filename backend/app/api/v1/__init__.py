@@ -41,6 +41,7 @@ api_v1.include_router(health_router)      # /health 不需要登录
 api_v1.include_router(auth_router)        # /auth 登录相关
 
 # --- 需要登录的接口 ---
+# 鉴权统一挂在这里：下面各模块的 APIRouter 不再各自声明 get_current_user
 protected = APIRouter(dependencies=[Depends(get_current_user)])
 
 protected.include_router(freight_router)
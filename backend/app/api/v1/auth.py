@@ -2,8 +2,8 @@
 
 from fastapi import APIRouter, Depends, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.services.auth_service import (
     clear_cookie, get_current_user, login_user,
 )
@@ -25,8 +25,8 @@ class UserOut(BaseModel):
 
 
 @router.post("/login", response_model=UserOut)
-def login(data: LoginInput, response: Response, db: Session = Depends(get_db)):
-    user = login_user(response, db, data.username, data.password)
+async def login(data: LoginInput, response: Response, db: AsyncSession = Depends(get_async_db)):
+    user = await login_user(response, db, data.username, data.password)
     return UserOut(
         id=user.id,
         username=user.username,
@@ -1,17 +1,15 @@
 
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any
 from app.integrations.dsz.dsz_products import get_products_by_skus_with_stats, get_products_by_skus
-from app.services.auth_service import get_current_user
 
 
 
 router = APIRouter(
     prefix="/dsz", 
     tags=["dsz"],
-    dependencies=[Depends(get_current_user)], 
 )
 
 
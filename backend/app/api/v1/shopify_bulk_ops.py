@@ -3,18 +3,16 @@
 # 用来手动触发或查询 Bulk 操作的状态
 
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel, Field
 from typing import Optional
 from app.orchestration.product_sync.product_sync_task import handle_bulk_finish
 from app.integrations.shopify.shopify_client import ShopifyClient
-from app.services.auth_service import get_current_user
 
 
 router = APIRouter(
     prefix="/shopify/bulk", 
     tags=["shopify.bulk"],
-    dependencies=[Depends(get_current_user)], 
 )
 
 
@@ -1,11 +1,18 @@
 # app/api/v1/webhooks_shopify.py
 
 from __future__ import annotations
-import hmac, hashlib, base64, json
-from fastapi import APIRouter, Request, Response, Header, HTTPException
+import hmac, base64
+from functools import lru_cache
+from typing import Any, Optional
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Request, Response, Header, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError, ValidatorFunctionWrapHandler, field_validator
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
+from sqlalchemy import select, update
+
 from app.db.session import SessionLocal
 from app.core.config import settings
 
@@ -14,7 +21,15 @@ from app.integrations.shopify.shopify_client import ShopifyClient
 from app.orchestration.product_sync.product_sync_task import handle_bulk_finish, poll_bulk_until_ready
 
 
-router = APIRouter(prefix="/webhooks/shopify", tags=["webhooks.shopify"])
+router = APIRouter(
+    prefix="/webhooks/shopify",
+    tags=["webhooks.shopify"],
+    default_response_class=ORJSONResponse,
+)
+
+
+# webhook 到达时间按 Celery 时区记录；ZoneInfo 只在导入时构建一次（与 price_reset 一致）
+_CELERY_TZ = ZoneInfo(getattr(settings, "CELERY_TIMEZONE", "Australia/Melbourne"))
 
 
 '''
@@ -30,29 +45,88 @@ router = APIRouter(prefix="/webhooks/shopify", tags=["webhooks.shopify"])
 
 
 # =============== 公共：HMAC 校验工具，HMAC 校验, 校验 HMAC（Shopify Webhook 签名） ===============
-def _compute_hmac_base64(secret: str, raw_body: bytes) -> str:
-    digest = hmac.new(secret.encode("utf-8"), raw_body, hashlib.sha256).digest()
-    return base64.b64encode(digest).decode()
+# 密钥只在导入时编码一次；未配置时为 None（校验时直接报错，不做无意义的哈希）
+_WEBHOOK_SECRET_BYTES = (
+    settings.SHOPIFY_WEBHOOK_SECRET.encode("utf-8") if settings.SHOPIFY_WEBHOOK_SECRET else None
+)
+# SHA-256 摘要 32 字节 → base64 固定 44 个字符
+_HMAC_B64_LEN = 44
+
+
+def _compute_hmac_base64(raw_body: bytes) -> str:
+    # hmac.digest 一次性在 C/OpenSSL 里算完，不建 HMAC 对象
+    return base64.b64encode(hmac.digest(_WEBHOOK_SECRET_BYTES, raw_body, "sha256")).decode()
 
 
 def _verify_hmac_or_401(provided_hmac_b64: str, raw_body: bytes) -> None:
     if not provided_hmac_b64:  # [ADDED] 缺失即 401，更安全
         raise HTTPException(status_code=401, detail="Missing HMAC")
-    
-    expected = _compute_hmac_base64(settings.SHOPIFY_WEBHOOK_SECRET, raw_body)
-    if not hmac.compare_digest(provided_hmac_b64, expected):
+    if len(provided_hmac_b64) != _HMAC_B64_LEN:
+        # 长度都不对，不可能匹配：不必对整个请求体做哈希
+        raise HTTPException(status_code=401, detail="Invalid HMAC")
+    if _WEBHOOK_SECRET_BYTES is None:
+        raise HTTPException(status_code=500, detail="Webhook secret not configured")
+
+    expected = _compute_hmac_base64(raw_body)
+    # 按字节比较：Header 里若混入非 ASCII 字符，str 版 compare_digest 会抛 TypeError（500）
+    if not hmac.compare_digest(provided_hmac_b64.encode("latin-1"), expected.encode("ascii")):
         # 正式环境建议抛 401；调试时可打印后返回 200 以便 Shopify 不连续重试
         raise HTTPException(status_code=401, detail="Invalid HMAC")
 
 
-# 反查 run_id（用于兜底轮询）
+# GraphQL BulkOperation 节点里 webhook 用到的字段；其余字段忽略。
+# rootObjectCount 是 UnsignedInt64，GraphQL 以字符串返回，由 pydantic 的宽松模式转成 int；格式不对时记为 None
+class BulkOperationNode(BaseModel):
+    status: Optional[str] = None
+    url: Optional[str] = None
+    rootObjectCount: Optional[int] = None
+
+    @field_validator("rootObjectCount", mode="wrap")
+    @classmethod
+    def _count_or_none(cls, value: Any, handler: ValidatorFunctionWrapHandler) -> Optional[int]:
+        try:
+            return handler(value)
+        except ValidationError:
+            return None
+
+
+# 反查 run_id（用于兜底轮询）：Core select 只取一列，不走 ORM Query。
+# bulk_gid 与 run 的对应关系建好后不再改，查到的结果按 gid 缓存；查不到时抛 LookupError，
+# lru_cache 不缓存异常 —— run 还没写入 bulk_id 时下一次仍会去查库
+@lru_cache(maxsize=256)
+def _cached_run_id(bulk_gid: str) -> str:
+    with SessionLocal() as db:
+        run_id = db.execute(
+            select(ProductSyncRun.id).where(ProductSyncRun.shopify_bulk_id == bulk_gid).limit(1)
+        ).scalar()
+    if run_id is None:
+        raise LookupError(bulk_gid)
+    return run_id
+
+
 def _run_id_by_bulk(bulk_gid: str) -> str | None:
-    db = SessionLocal()
     try:
-        row = db.query(ProductSyncRun.id).filter_by(shopify_bulk_id=bulk_gid).first()
-        return row[0] if row else None
-    finally:
-        db.close()
+        return _cached_run_id(bulk_gid)
+    except LookupError:
+        return None
+
+
+# 首次记录 webhook 到达时间：单条条件 UPDATE（IS NULL 保证只写第一次），没有先查后改的竞态；
+# 由 BackgroundTasks 在响应发出后执行（同步函数 → 线程池），不占事件循环
+def _stamp_webhook_received(bulk_gid: str, received_at: datetime) -> None:
+    with SessionLocal() as db:
+        try:
+            db.execute(
+                update(ProductSyncRun)
+                .where(
+                    ProductSyncRun.shopify_bulk_id == bulk_gid,
+                    ProductSyncRun.webhook_received_at.is_(None),
+                )
+                .values(webhook_received_at=received_at)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()   # 只是记录时间，失败不影响主流程
 
 
 
@@ -75,6 +149,7 @@ Webhook: bulk_operations/finish
 @router.post("/bulk_operations/finish")
 async def bulk_finish(
     request: Request,
+    background: BackgroundTasks,
     x_shopify_hmac_sha256: str = Header(default=""),
     x_shopify_topic: str = Header(default=""),
     x_shopify_shop_domain: str = Header(default=""),
@@ -90,10 +165,12 @@ async def bulk_finish(
         # 非本主题；快速 200，避免重试（保持体面）
         return {"ok": True, "ignored": f"topic={x_shopify_topic}"}
 
-    # 3) 解析 payload
-    try: 
-        payload = json.loads(raw.decode("utf-8"))
-    except Exception:
+    # 3) 解析 payload：orjson 直接吃 bytes，不必先 decode 成 str
+    try:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(payload, dict):
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
     
     # 🔄 异步处理（不要阻塞 webhook）
@@ -120,31 +197,15 @@ async def bulk_finish(
             pass             # 兜底失败也不影响 200
         return {"ok": True, "note": f"query error: {type(e).__name__}"}
 
-    status = (node.get("status") or "").upper()  # GraphQL 返回通常是大写
-    url = node.get("url")
+    parsed = BulkOperationNode.model_validate(node or {})
+    status = (parsed.status or "").upper()  # GraphQL 返回通常是大写
+    url = parsed.url
+    root_object_count = parsed.rootObjectCount
 
-    try:
-        root_object_count = (
-            int(node.get("rootObjectCount"))
-            if node.get("rootObjectCount") is not None
-            else None
-        )
-    except Exception:
-        root_object_count = None
-    
 
-    # 5) 标记 webhook 到达时间（仅首次）：首次记录 webhook 到达时间（区分 webhook 触发 vs 轮询触发）只在第一次写入
-    db = SessionLocal()
-    try:
-        run = db.query(ProductSyncRun).filter_by(shopify_bulk_id=bulk_gid).first()
-        if run and not getattr(run, "webhook_received_at", None):
-            tz = ZoneInfo(getattr(settings, "CELERY_TIMEZONE", "Australia/Melbourne"))
-            run.webhook_received_at = datetime.now(tz)
-            db.commit()
-    except Exception:
-        db.rollback()   # 不让 DB 异常影响 200
-    finally:
-        db.close()
+    # 5) 标记 webhook 到达时间（仅首次，区分 webhook 触发 vs 轮询触发）：
+    #    时间在这里取（到达时刻），写库放到响应之后，不阻塞 200
+    background.add_task(_stamp_webhook_received, bulk_gid, datetime.now(_CELERY_TZ))
 
 
     # 6) 未完成或无 URL：快速返回（5 秒规则），由轮询或后续 webhook 兜底
@@ -173,15 +234,3 @@ async def bulk_finish(
         # "objectCount": object_count,
         "rootObjectCount": root_object_count,
     }
-
-
-
-
-# 反查 run_id（用于兜底轮询）
-def _run_id_by_bulk(bulk_gid: str) -> str | None:
-    db = SessionLocal()
-    try:
-        row = db.query(ProductSyncRun.id).filter_by(shopify_bulk_id=bulk_gid).first()
-        return row[0] if row else None
-    finally:
-        db.close()
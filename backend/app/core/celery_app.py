@@ -46,6 +46,10 @@ celery_app.conf.update(
     worker_concurrency=1,
     worker_prefetch_multiplier=1,    # 一个 worker 一次只取一个任务
     task_acks_late=True,             # worker crash 后任务会回队列/任务会重新分配 防止任务丢失,任务执行完再确认，异常可重投
+    task_reject_on_worker_lost=True, # 配合 acks_late：worker 进程被 SIGKILL/OOM 时任务重新入队，而不是直接被确认丢掉
+    worker_disable_rate_limits=True, # 没有任务设置 rate_limit（DSZ 限流在 http_client 里做），省掉每次取任务的限流记账
+    worker_send_task_events=False,   # 没有 Flower 等监控订阅事件：不发任务事件，少一批 Redis PUBLISH
+    task_send_sent_event=False,
     # task_time_limit=60 * 20,         # 最长运行 20 分钟（硬超时）不适合：需要释放外部资源/写回状态/删临时文件的任务（比如有 DSZ/Shopify 的长 I/O、分页拉取、文件生成等）。
     # task_soft_time_limit=60 * 18,    # 18 分钟发软中断，留 2 分钟清理, 按每个任务真实耗时来定。
     # result_expires=3600,             # 结果保存 1 小时
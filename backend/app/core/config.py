@@ -54,6 +54,22 @@ class Settings(BaseSettings):
         alias="DATABASE_URL_LOCAL",
         description="Optional local URL for tools (e.g., DBeaver/psql). Typically '...@localhost:5432/yarra_dev'"
     )
+    # 连接池：API 与 Celery 共用同一套参数，按需在 .env 调整。
+    # DB_POOL_SIZE / DB_MAX_OVERFLOW 是一个进程组的总预算：gunicorn 下按 WEB_CONCURRENCY 平分给各 worker（见 db/session.py）
+    DB_POOL_SIZE: int = Field(20, ge=1, alias="DB_POOL_SIZE")              # 常驻连接（所有 worker 合计）
+    DB_MAX_OVERFLOW: int = Field(20, ge=0, alias="DB_MAX_OVERFLOW")        # 高峰期额外连接（所有 worker 合计）
+    # 异步 engine 单独的连接池预算，同样按 worker 平分：运费列表/导出、模板下载、登录，
+    # 以及每个受保护请求的鉴权查用户（查完即归还连接，见 auth_service.get_current_user）
+    DB_ASYNC_POOL_SIZE: int = Field(8, ge=1, alias="DB_ASYNC_POOL_SIZE")
+    DB_ASYNC_MAX_OVERFLOW: int = Field(8, ge=0, alias="DB_ASYNC_MAX_OVERFLOW")
+    # gunicorn worker 数；gunicorn_conf.py 会写回这个环境变量，单进程（uvicorn/Celery/脚本）默认 1
+    WEB_CONCURRENCY: int = Field(1, ge=1, alias="WEB_CONCURRENCY")
+    DB_POOL_RECYCLE: int = Field(1800, ge=60, alias="DB_POOL_RECYCLE")     # 秒；防止长连接被中间设备/PgBouncer 断开
+    DB_POOL_TIMEOUT: int = Field(30, ge=1, alias="DB_POOL_TIMEOUT")        # 取连接最长等待秒数
+    DB_QUERY_CACHE_SIZE: int = Field(1200, ge=0, alias="DB_QUERY_CACHE_SIZE")  # SQL 编译缓存条目数（SQLAlchemy 默认 500）
+    # 单条 SQL 最长执行毫秒数（连接级 statement_timeout）；0 = 不限制。
+    # Celery 的批量 upsert/purge 与 API 共用本配置，只建议在 API 容器的 .env 里设（如 15000）
+    DB_STATEMENT_TIMEOUT_MS: int = Field(0, ge=0, alias="DB_STATEMENT_TIMEOUT_MS")
     # todo
     REDIS_URL: Optional[str] = None
 
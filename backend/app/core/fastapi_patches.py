@@ -0,0 +1,47 @@
+
+# FastAPI 运行期小补丁
+
+import functools
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from fastapi.dependencies import utils as dep_utils
+
+
+# solve_dependencies 每个请求、每个依赖都会重新调用这三个函数（内部走 inspect.*），
+# 依赖函数在进程内是固定的，结果可以按 callable 缓存
+_INTROSPECTION_FUNCS = ("is_gen_callable", "is_async_gen_callable", "is_coroutine_callable")
+
+
+def _cache_by_callable(fn: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    # 用 WeakKeyDictionary：dependency_overrides 在测试里会生成临时 callable，不能让缓存拖住它们
+    cache: "WeakKeyDictionary[Any, bool]" = WeakKeyDictionary()
+
+    @functools.wraps(fn)
+    def wrapper(call: Any) -> bool:
+        try:
+            return cache[call]
+        except KeyError:
+            pass
+        except TypeError:
+            # 不可弱引用的对象：退回原始判断
+            return fn(call)
+        result = fn(call)
+        cache[call] = result
+        return result
+
+    wrapper._yarra_cached = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+"""
+在创建 FastAPI app 之前调用一次；重复调用是安全的。
+    - 只替换 fastapi.dependencies.utils 里的模块级函数，solve_dependencies 按名字查找，直接生效
+    - get_typed_signature 只在注册路由时调用，不在请求路径上，不用处理
+"""
+def install_dependency_introspection_cache() -> None:
+    for name in _INTROSPECTION_FUNCS:
+        fn = getattr(dep_utils, name)
+        if getattr(fn, "_yarra_cached", False):
+            continue
+        setattr(dep_utils, name, _cache_by_callable(fn))
@@ -1,6 +1,38 @@
 
-# bind = "0.0.0.0:8000"   # ← 必须是 0.0.0.0，不要是 127.0.0.1
-# workers = 2
-# worker_class = "uvicorn.workers.UvicornWorker"
-# timeout = 120
+# gunicorn 生产配置：gunicorn -c app/core/gunicorn_conf.py app.main:app
+# UvicornWorker 在装了 uvicorn[standard] 时自动用 uvloop + httptools（loop/http = "auto"）
 
+import multiprocessing
+import os
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")   # ← 必须是 0.0.0.0，不要是 127.0.0.1
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 默认每核一个 worker、最多 4 个（UvicornWorker 是异步的，不需要 2*CPU+1）；容器里可用 WEB_CONCURRENCY 覆盖。
+# 写回环境变量：应用导入时据此把 DB_POOL_SIZE / DB_MAX_OVERFLOW 平分给各 worker，总连接数不随 worker 数放大
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 4)))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))           # 导出 CSV 等长请求留足时间
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# 生产默认关闭 access log（每个请求一次同步写）；排查时设 GUNICORN_ACCESS_LOG=- 输出到 stdout
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+# 在 master 里导入一次应用（路由、模型、Shopify/DSZ 客户端），fork 后各 worker 写时复制共享，
+# 不再每个 worker 各自导入一遍
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def post_fork(server, worker):
+    # preload 时 engine 在 master 里创建：fork 后丢弃继承来的连接池（close=False 不动父进程的连接），
+    # 让每个 worker 重新建自己的连接
+    from app.db.session import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
@@ -3,8 +3,42 @@ import os
 import sys
 from typing import Optional
 
+import orjson
+
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 DEFAULT_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# 默认输出一行一个 JSON（orjson 直接写 bytes）；本地调试想看文本格式可设 LOG_JSON=0
+LOG_JSON = os.getenv("LOG_JSON", "1").lower() not in ("0", "false", "no")
+
+
+class JsonLineHandler(logging.Handler):
+    """
+    每条记录写成一行 JSON 到 stdout：时间用 record.created（epoch 秒），
+    不走 % 格式化、也不调 time.strftime 生成 asctime。
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            entry = {
+                "ts": record.created,
+                "lvl": record.levelname,
+                "name": record.name,
+                "msg": record.getMessage(),
+            }
+            if record.exc_info:
+                entry["exc"] = logging.Formatter().formatException(record.exc_info)
+            line = orjson.dumps(entry) + b"\n"
+            # 每次取当前的 sys.stdout（测试/重定向时会被替换）；没有 buffer 的流退回写 str
+            stream = sys.stdout
+            buffer = getattr(stream, "buffer", None)
+            if buffer is not None:
+                buffer.write(line)
+                buffer.flush()
+            else:
+                stream.write(line.decode("utf-8"))
+                stream.flush()
+        except Exception:
+            self.handleError(record)
 
 
 def configure_logging(level: Optional[str] = None) -> logging.Logger:
@@ -16,11 +50,16 @@ def configure_logging(level: Optional[str] = None) -> logging.Logger:
     root_logger = logging.getLogger()
 
     if not root_logger.handlers:
-        logging.basicConfig(
-            level=resolved_level,
-            format=LOG_FORMAT,
-            handlers=[logging.StreamHandler(sys.stdout)],
-        )
+        if LOG_JSON:
+            # 没有任何格式用到线程名：创建每条记录时不再去取线程信息。
+            # 进程号/进程名保留：gunicorn 与 Celery worker 自己的日志格式里有 %(process)d / %(processName)s
+            logging.logThreads = False
+            handler: logging.Handler = JsonLineHandler()
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root_logger.addHandler(handler)
+        root_logger.setLevel(resolved_level)
     else:
         root_logger.setLevel(resolved_level)
 
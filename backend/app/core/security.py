@@ -1,23 +1,53 @@
 
 
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Optional
 
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+import jwt
+import bcrypt
 from app.core.config import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 
 
+# bcrypt 校验一次要几十到几百毫秒的 CPU：放到专用线程池里，不占 AnyIO 默认线程池（其它 sync 路由共用）。
+# bcrypt 的 C 实现计算时会释放 GIL，线程池就能多核并行；不用进程池——preload 后 fork 出来的进程池不安全
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
+
+# bcrypt 只使用前 72 字节：显式截断，行为与之前 passlib 一致，也不受新版 bcrypt 超长报错影响
+_BCRYPT_MAX_BYTES = 72
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+
+
+# 直接调用 bcrypt（C 实现），省掉 passlib 的识别/分派开销；已有的 $2b$ 哈希照常可校验
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("ascii"))
+    except ValueError:
+        # 库里的哈希格式不对：按校验失败处理，不让登录接口 500
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt()).decode("ascii")
 
 
 '''
@@ -32,8 +62,20 @@ def create_access_token(subject: dict[str, Any], expires_minutes: int | None = N
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_token(token: str) -> Optional[dict[str, Any]]:
+# 同一个 token 在有效期内每个受保护请求都会带上：验签结果按 token 缓存，命中时只剩一次 exp 比较。
+# 无效 token 缓存为 None（签名不对/已过期的结果不会再变）；SECRET_KEY 只在重启时变化，缓存随进程清空
+@lru_cache(maxsize=4096)
+def _decode_verified(token: str) -> Optional[dict[str, Any]]:
     try:
-        return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError:
+        # 必须带 exp（PyJWT 默认不要求）：decode_token 依赖它做过期比较，没有 exp 的 token 一律视为无效
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp"]})
+    except jwt.PyJWTError:
+        return None
+
+
+def decode_token(token: str) -> Optional[dict[str, Any]]:
+    payload = _decode_verified(token)
+    # 缓存命中时 PyJWT 不会再校验 exp，这里自己比较
+    if payload is None or payload["exp"] <= time.time():
         return None
+    return dict(payload)   # 给调用方副本，避免改到缓存里的那份
@@ -1,7 +1,10 @@
 
 # 导出入口，给脚本/临时建表用
 
-from .session import engine, SessionLocal, get_db, dispose_engine
+from .session import (
+    engine, SessionLocal, get_db, dispose_engine,
+    async_engine, AsyncSessionLocal, get_async_db, dispose_async_engine,
+)
 from app.db.model import *  # 确保把所有模型加载进 Base.metadata
 from .base import Base
 
@@ -58,10 +58,13 @@ def run_migrations_offline():
 
 """连接数据库直接执行迁移（在线模式）"""
 def run_migrations_online():
+    # 整个迁移只 connect() 一次，所有 revision 与 op.get_bind() 共用这一条连接，NullPool 只是在结束时直接关掉它。
+    # statement_timeout=0：库/角色上若配了语句超时，长时间的建索引、分批回填不会被中途取消
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.", 
         poolclass=pool.NullPool,
+        connect_args={"options": "-c statement_timeout=0"},
     )
 
     with connectable.connect() as connection:
@@ -0,0 +1,53 @@
+"""add freight list prefix and ordering indexes
+
+Revision ID: 0b7e5c2d9a41
+Revises: b168123c0527
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e5c2d9a41'
+down_revision = 'b168123c0527'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不能在事务里执行；建索引期间不锁写
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_kogan_sku_freight_fee_lower_sku_code',
+            'kogan_sku_freight_fee',
+            [sa.text('lower(sku_code) text_pattern_ops')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_kogan_sku_freight_fee_updated_sku',
+            'kogan_sku_freight_fee',
+            [sa.text('updated_at DESC NULLS LAST'), 'sku_code'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_kogan_sku_freight_fee_updated_sku',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_sku_freight_fee_lower_sku_code',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
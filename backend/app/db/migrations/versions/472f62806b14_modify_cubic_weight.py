@@ -43,5 +43,28 @@ def downgrade() -> None:
                existing_type=sa.INTEGER(),
                server_default=sa.text('0'),
                existing_nullable=False)
-    op.create_unique_constraint('ux_kogan_export_job_sku_unique', 'kogan_export_job_skus', ['job_id', 'sku'])
     # ### end Alembic commands ###
+
+    # 回退时表里已有数据：先 CONCURRENTLY 建唯一索引（不阻塞导出写入），再 USING INDEX 挂成约束，只改目录
+    with op.get_context().autocommit_block():
+        try:
+            op.create_index(
+                'ux_kogan_export_job_sku_unique',
+                'kogan_export_job_skus',
+                ['job_id', 'sku'],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+        except Exception:
+            # 约束删除期间可能写进了重复 (job_id, sku)：删掉留下的 INVALID 索引再抛出
+            op.drop_index(
+                'ux_kogan_export_job_sku_unique',
+                table_name='kogan_export_job_skus',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+            raise
+    op.execute(
+        "ALTER TABLE kogan_export_job_skus "
+        "ADD CONSTRAINT ux_kogan_export_job_sku_unique UNIQUE USING INDEX ux_kogan_export_job_sku_unique"
+    )
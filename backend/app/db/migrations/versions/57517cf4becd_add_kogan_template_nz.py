@@ -1,7 +1,7 @@
 """add kogan_template_nz
 
 Revision ID: 57517cf4becd
-Revises: fa2d9d6b7c31
+Revises: c4d7e9a2b815
 Create Date: 2025-11-01 01:32:20.556652
 
 """
@@ -12,7 +12,7 @@ from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = "57517cf4becd"
-down_revision = "fa2d9d6b7c31"
+down_revision = "c4d7e9a2b815"
 branch_labels = None
 depends_on = None
 
@@ -21,17 +21,14 @@ def upgrade() -> None:
     # 1. 原 kogan_template 表重命名为 kogan_template_au
     op.rename_table("kogan_template", "kogan_template_au")
 
-    # 2. 更新索引名称（原索引仍存在但表名改变）
-    op.drop_index("ix_kogan_template_sku", table_name="kogan_template_au")
+    # 2. 更新索引名称（原索引仍存在但表名改变）：RENAME 只改目录，不重建 btree；
+    #    ix_kogan_template_sku_unique 同样是 (sku) 上的普通索引，与前者重复，直接删掉
+    op.execute("ALTER INDEX ix_kogan_template_sku RENAME TO ix_kogan_template_au_sku")
     op.drop_index("ix_kogan_template_sku_unique", table_name="kogan_template_au")
-    op.create_index(
-        "ix_kogan_template_au_sku",
-        "kogan_template_au",
-        ["sku"],
-        unique=False,
-    )
 
-    # 3. 创建 kogan_template_NZ（先以字符串列占位，稍后转换回 enum）
+    # 3. 创建 kogan_template_NZ：country_type 直接建成已有的枚举类型（create_type=False 不重复建类型），
+    #    不再先建字符串列再 ALTER TYPE 转换（那样要多三条 DDL，并重写一次表）
+    country_enum = postgresql.ENUM("AU", "NZ", name="country_type_enum", create_type=False)
     op.create_table(
         "kogan_template_nz",
         sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
@@ -41,32 +38,13 @@ def upgrade() -> None:
         sa.Column("kogan_first_price", sa.Numeric(precision=12, scale=2), nullable=True),
         sa.Column("shipping", sa.String(length=128), nullable=True),
         sa.Column("handling_days", sa.Integer(), nullable=True),
-        sa.Column("country_type", sa.String(length=2), server_default="NZ", nullable=False),
+        sa.Column("country_type", country_enum, server_default=sa.text("'NZ'::country_type_enum"), nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
         sa.PrimaryKeyConstraint("id", name=op.f("pk_kogan_template_NZ")),
     )
     op.create_index("ix_kogan_template_nz_sku", "kogan_template_nz", ["sku"], unique=False)
 
-    # 3.1 将 country_type 列转换为已有的枚举类型，并恢复默认值
-    country_enum = postgresql.ENUM("AU", "NZ", name="country_type_enum", create_type=False)
-    op.alter_column(
-        "kogan_template_nz",
-        "country_type",
-        server_default=None,
-    )
-    op.alter_column(
-        "kogan_template_nz",
-        "country_type",
-        type_=country_enum,
-        postgresql_using="country_type::country_type_enum",
-    )
-    op.alter_column(
-        "kogan_template_nz",
-        "country_type",
-        server_default=sa.text("'NZ'::country_type_enum"),
-    )
-
     # 4. 历史数据由业务流程重新生成，此处不迁移
 
 
@@ -76,8 +54,7 @@ def downgrade() -> None:
     op.drop_table("kogan_template_nz")
 
     # 2. 恢复 AU 表索引
-    op.drop_index("ix_kogan_template_au_sku", table_name="kogan_template_au")
-    op.create_index("ix_kogan_template_sku", "kogan_template_au", ["sku"], unique=False)
+    op.execute("ALTER INDEX ix_kogan_template_au_sku RENAME TO ix_kogan_template_sku")
     op.create_index("ix_kogan_template_sku_unique", "kogan_template_au", ["sku"], unique=False)
 
     # 3. 表名恢复原状
@@ -6,7 +6,6 @@ Create Date: 2025-10-29 12:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,42 +16,51 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # 新增与流程匹配的字段
-    op.add_column('freight_runs', sa.Column('product_run_id', sa.String(length=36), nullable=True))
-    op.add_column('freight_runs', sa.Column('candidate_count', sa.Integer(), nullable=False, server_default='0'))
-    op.add_column('freight_runs', sa.Column('changed_count', sa.Integer(), nullable=False, server_default='0'))
-    op.add_column('freight_runs', sa.Column('message', sa.Text(), nullable=True))
-    op.add_column('freight_runs', sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True))
+    # 新增与流程匹配的字段、清理不再使用的旧字段：合并成一条 ALTER TABLE，只拿一次 ACCESS EXCLUSIVE 锁
+    op.execute(
+        "ALTER TABLE freight_runs"
+        " ADD COLUMN product_run_id VARCHAR(36),"
+        " ADD COLUMN candidate_count INTEGER NOT NULL DEFAULT 0,"
+        " ADD COLUMN changed_count INTEGER NOT NULL DEFAULT 0,"
+        " ADD COLUMN message TEXT,"
+        " ADD COLUMN finished_at TIMESTAMP WITH TIME ZONE,"
+        " DROP COLUMN total_batches,"
+        " DROP COLUMN finished_batches,"
+        " DROP COLUMN rows_in,"
+        " DROP COLUMN rows_changed,"
+        " DROP COLUMN error_summary"
+    )
     op.create_index('ix_freight_runs_product_run_id', 'freight_runs', ['product_run_id'], unique=False)
 
-    # 清理不再使用的旧字段
-    op.drop_column('freight_runs', 'total_batches')
-    op.drop_column('freight_runs', 'finished_batches')
-    op.drop_column('freight_runs', 'rows_in')
-    op.drop_column('freight_runs', 'rows_changed')
-    op.drop_column('freight_runs', 'error_summary')
-
-    # 移除 server_default，保持应用侧默认值
-    op.alter_column('freight_runs', 'candidate_count', server_default=None, existing_type=sa.Integer())
-    op.alter_column('freight_runs', 'changed_count', server_default=None, existing_type=sa.Integer())
+    # 移除 server_default，保持应用侧默认值（同一条语句，一次加锁）
+    op.execute(
+        "ALTER TABLE freight_runs"
+        " ALTER COLUMN candidate_count DROP DEFAULT,"
+        " ALTER COLUMN changed_count DROP DEFAULT"
+    )
 
 
 def downgrade() -> None:
-    # 恢复旧字段
-    op.add_column('freight_runs', sa.Column('error_summary', sa.TEXT(), nullable=True))
-    op.add_column('freight_runs', sa.Column('rows_changed', sa.Integer(), nullable=False, server_default='0'))
-    op.add_column('freight_runs', sa.Column('rows_in', sa.Integer(), nullable=False, server_default='0'))
-    op.add_column('freight_runs', sa.Column('finished_batches', sa.Integer(), nullable=False, server_default='0'))
-    op.add_column('freight_runs', sa.Column('total_batches', sa.Integer(), nullable=False, server_default='0'))
-
-    op.alter_column('freight_runs', 'total_batches', server_default=None, existing_type=sa.Integer())
-    op.alter_column('freight_runs', 'finished_batches', server_default=None, existing_type=sa.Integer())
-    op.alter_column('freight_runs', 'rows_in', server_default=None, existing_type=sa.Integer())
-    op.alter_column('freight_runs', 'rows_changed', server_default=None, existing_type=sa.Integer())
-
     op.drop_index('ix_freight_runs_product_run_id', table_name='freight_runs')
-    op.drop_column('freight_runs', 'finished_at')
-    op.drop_column('freight_runs', 'message')
-    op.drop_column('freight_runs', 'changed_count')
-    op.drop_column('freight_runs', 'candidate_count')
-    op.drop_column('freight_runs', 'product_run_id')
+
+    # 恢复旧字段、删除新字段：同样合并成一条 ALTER TABLE
+    op.execute(
+        "ALTER TABLE freight_runs"
+        " ADD COLUMN error_summary TEXT,"
+        " ADD COLUMN rows_changed INTEGER NOT NULL DEFAULT 0,"
+        " ADD COLUMN rows_in INTEGER NOT NULL DEFAULT 0,"
+        " ADD COLUMN finished_batches INTEGER NOT NULL DEFAULT 0,"
+        " ADD COLUMN total_batches INTEGER NOT NULL DEFAULT 0,"
+        " DROP COLUMN finished_at,"
+        " DROP COLUMN message,"
+        " DROP COLUMN changed_count,"
+        " DROP COLUMN candidate_count,"
+        " DROP COLUMN product_run_id"
+    )
+    op.execute(
+        "ALTER TABLE freight_runs"
+        " ALTER COLUMN total_batches DROP DEFAULT,"
+        " ALTER COLUMN finished_batches DROP DEFAULT,"
+        " ALTER COLUMN rows_in DROP DEFAULT,"
+        " ALTER COLUMN rows_changed DROP DEFAULT"
+    )
@@ -0,0 +1,31 @@
+"""add content_encoding to kogan export jobs
+
+Revision ID: 7d4a1f6b2c83
+Revises: 0b7e5c2d9a41
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4a1f6b2c83'
+down_revision = '0b7e5c2d9a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 可空列：旧 job 保持 NULL（未压缩），不需要回填
+    op.add_column(
+        'kogan_export_jobs',
+        sa.Column('content_encoding', sa.String(length=16), nullable=True),
+    )
+    # 新文件写入前已 gzip，TOAST 再压缩一次没有意义；EXTERNAL 让 substring() 分块读取只取需要的 TOAST 块
+    op.execute("ALTER TABLE kogan_export_jobs ALTER COLUMN file_content SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE kogan_export_jobs ALTER COLUMN file_content SET STORAGE EXTENDED")
+    op.drop_column('kogan_export_jobs', 'content_encoding')
@@ -0,0 +1,32 @@
+"""drop redundant kogan_export_job_skus job_id index
+
+Revision ID: 9e3b6a1d4f52
+Revises: 7d4a1f6b2c83
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b6a1d4f52'
+down_revision = '7d4a1f6b2c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # f3c1c8c0a123 已不再建这个索引；这里只清理已经跑过旧版本迁移的库。
+    # (job_id, sku) 复合索引的前缀覆盖只按 job_id 的查询，单列索引只是多一份写放大
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_kogan_export_job_skus_job_id',
+            table_name='kogan_export_job_skus',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    # 新建的库从来没有这个索引，回退时不再补建
+    pass
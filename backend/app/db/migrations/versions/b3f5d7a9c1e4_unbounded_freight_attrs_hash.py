@@ -0,0 +1,26 @@
+"""drop the length cap on kogan_sku_freight_fee.attrs_hash_last_calc
+
+Revision ID: b3f5d7a9c1e4
+Revises: 9e3b6a1d4f52
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f5d7a9c1e4'
+down_revision = '9e3b6a1d4f52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 与 sku_info.attrs_hash_current 一致用不限长的 varchar；放宽长度是二进制兼容转换，
+    # 不带 USING 时 Postgres 只改目录、不重写表，以后换哈希算法也不用再改列
+    op.execute("ALTER TABLE kogan_sku_freight_fee ALTER COLUMN attrs_hash_last_calc TYPE varchar")
+
+
+def downgrade() -> None:
+    # 收紧长度要逐行校验（全表扫描，但不重写）
+    op.execute("ALTER TABLE kogan_sku_freight_fee ALTER COLUMN attrs_hash_last_calc TYPE varchar(128)")
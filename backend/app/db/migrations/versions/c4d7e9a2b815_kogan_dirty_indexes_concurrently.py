@@ -0,0 +1,92 @@
+"""build per-country kogan dirty indexes concurrently and drop kogan_dirty
+
+Revision ID: c4d7e9a2b815
+Revises: fa2d9d6b7c31
+Create Date: 2025-10-30 13:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e9a2b815'
+down_revision = 'fa2d9d6b7c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不能在事务里执行；建/删索引期间运费计算仍可写 kogan_sku_freight_fee
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_kogan_dirty_au_true_only',
+            'kogan_sku_freight_fee',
+            ['sku_code'],
+            unique=False,
+            postgresql_where=sa.text('kogan_dirty_au = true'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_kogan_dirty_nz_true_only',
+            'kogan_sku_freight_fee',
+            ['sku_code'],
+            unique=False,
+            postgresql_where=sa.text('kogan_dirty_nz = true'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_dirty_true_only',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_dirty_source',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    # 引用它的索引都已删掉，DROP COLUMN 只改目录，锁持有时间很短
+    op.execute("ALTER TABLE kogan_sku_freight_fee DROP COLUMN IF EXISTS kogan_dirty")
+
+
+def downgrade() -> None:
+    op.add_column(
+        'kogan_sku_freight_fee',
+        sa.Column('kogan_dirty', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_kogan_dirty_true_only',
+            'kogan_sku_freight_fee',
+            ['sku_code'],
+            unique=False,
+            postgresql_where=sa.text('kogan_dirty = true'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_kogan_dirty_source',
+            'kogan_sku_freight_fee',
+            ['kogan_dirty', 'last_changed_source'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_dirty_au_true_only',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_dirty_nz_true_only',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
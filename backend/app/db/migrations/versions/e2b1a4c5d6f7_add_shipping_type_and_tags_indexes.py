@@ -5,7 +5,8 @@ Revises: 9d6cf6b17f4e
 Create Date: 2025-11-27 00:00:00.000000
 
 """
-from alembic import op
+from alembic import context, op
+import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -15,23 +16,68 @@ branch_labels = None
 depends_on = None
 
 
+# CONCURRENTLY 建索引中途失败会留下一个 INVALID 索引，IF NOT EXISTS 会把它当成已存在而跳过：
+# 重跑前先把这种残留删掉（离线 --sql 模式查不了库，跳过）
+def _drop_invalid_index(name: str, table: str) -> None:
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+# 建索引失败（锁超时、唯一冲突、被取消等）时顺手删掉这次留下的 INVALID 索引再抛出，
+# 不等下一次重跑时才清理；进程被直接杀掉的情况仍由 _drop_invalid_index 兜底
+def _create_index_concurrently(name: str, table: str, columns: list, **kw) -> None:
+    _drop_invalid_index(name, table)
+    try:
+        op.create_index(
+            name,
+            table,
+            columns,
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kw,
+        )
+    except Exception:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        raise
+
+
 def upgrade() -> None:
-    op.create_index(
-        'ix_kogan_sku_freight_fee_shipping_type',
-        'kogan_sku_freight_fee',
-        ['shipping_type'],
-        unique=False,
-    )
-
-    op.create_index(
-        'gin_sku_info_product_tags',
-        'sku_info',
-        ['product_tags'],
-        unique=False,
-        postgresql_using='gin',
-    )
+    # CONCURRENTLY 不能在事务里执行；建索引期间不锁 sku_info / 运费表的写入
+    with op.get_context().autocommit_block():
+        _create_index_concurrently(
+            'ix_kogan_sku_freight_fee_shipping_type',
+            'kogan_sku_freight_fee',
+            ['shipping_type'],
+        )
+        _create_index_concurrently(
+            'gin_sku_info_product_tags',
+            'sku_info',
+            ['product_tags'],
+            postgresql_using='gin',
+        )
 
 
 def downgrade() -> None:
-    op.drop_index('gin_sku_info_product_tags', table_name='sku_info')
-    op.drop_index('ix_kogan_sku_freight_fee_shipping_type', table_name='kogan_sku_freight_fee')
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'gin_sku_info_product_tags',
+            table_name='sku_info',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_kogan_sku_freight_fee_shipping_type',
+            table_name='kogan_sku_freight_fee',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
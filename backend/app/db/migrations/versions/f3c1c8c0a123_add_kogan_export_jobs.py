@@ -21,6 +21,8 @@ STATUS_ENUM_NAME = 'kogan_export_job_status'
 STATUS_VALUES = ('pending', 'exported', 'failed', 'applied', 'apply_failed')
 
 
+# CREATE TYPE 没有 IF NOT EXISTS：直接建，已存在时吞掉 duplicate_object。
+# 仍是一条语句，但不再先查 pg_type（那个查法也不看 schema，别的 schema 里有同名类型会误判为已存在）
 def _ensure_status_enum_exists(bind):
     values_sql = ", ".join(f"'{v}'" for v in STATUS_VALUES)
     bind.execute(
@@ -28,11 +30,8 @@ def _ensure_status_enum_exists(bind):
             f"""
             DO $$
             BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_type WHERE typname = '{STATUS_ENUM_NAME}'
-                ) THEN
-                    CREATE TYPE {STATUS_ENUM_NAME} AS ENUM ({values_sql});
-                END IF;
+                CREATE TYPE {STATUS_ENUM_NAME} AS ENUM ({values_sql});
+            EXCEPTION WHEN duplicate_object THEN NULL;
             END
             $$;
             """
@@ -74,14 +73,13 @@ def upgrade() -> None:
         sa.Column('changed_columns', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
         sa.UniqueConstraint('job_id', 'sku', name='ux_kogan_export_job_sku_unique'),
     )
-    op.create_index('ix_kogan_export_job_skus_job_id', 'kogan_export_job_skus', ['job_id'])
+    # 只按 job_id 查的语句走 (job_id, sku) 唯一索引的前缀，不再单独建 job_id 索引
     op.create_index('ix_kogan_export_job_skus_sku', 'kogan_export_job_skus', ['sku'])
 
 
 def downgrade() -> None:
     op.drop_constraint('ux_kogan_export_job_sku_unique', 'kogan_export_job_skus', type_='unique')
     op.drop_index('ix_kogan_export_job_skus_sku', table_name='kogan_export_job_skus')
-    op.drop_index('ix_kogan_export_job_skus_job_id', table_name='kogan_export_job_skus')
     op.drop_table('kogan_export_job_skus')
     op.drop_table('kogan_export_jobs')
 
@@ -5,7 +5,7 @@ Revises: f3c1c8c0a123
 Create Date: 2025-10-30 13:45:00.000000
 
 """
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -15,62 +15,62 @@ branch_labels = None
 depends_on = None
 
 
-def upgrade() -> None:
-    op.add_column(
-        'kogan_sku_freight_fee',
-        sa.Column('kogan_dirty_au', sa.Boolean(), nullable=False, server_default=sa.text('false')),
-    )
-    op.add_column(
-        'kogan_sku_freight_fee',
-        sa.Column('kogan_dirty_nz', sa.Boolean(), nullable=False, server_default=sa.text('false')),
-    )
+# 回填每批行数：每批单独提交，行锁和单个事务的 WAL 都限制在这个量级
+_BACKFILL_BATCH = 5000
 
-    op.execute(
-        "UPDATE kogan_sku_freight_fee SET kogan_dirty_au = kogan_dirty, kogan_dirty_nz = kogan_dirty"
+# 新列默认 false，只有 kogan_dirty = true 的行需要回填；
+# 按 sku_code 做 keyset 分页，batch 走旧的部分索引 ix_kogan_dirty_true_only（sku_code WHERE kogan_dirty）。
+# 下一批的起点（max）也在 SQL 里算，和 ORDER BY 用同一个排序规则
+_BACKFILL_SQL = sa.text(
+    """
+    WITH batch AS (
+        SELECT sku_code FROM kogan_sku_freight_fee
+        WHERE kogan_dirty = true AND sku_code > :after
+        ORDER BY sku_code
+        LIMIT :lim
+    ), upd AS (
+        UPDATE kogan_sku_freight_fee f SET kogan_dirty_au = true, kogan_dirty_nz = true
+        FROM batch WHERE f.sku_code = batch.sku_code
     )
+    SELECT max(sku_code), count(*) FROM batch
+    """
+)
 
-    op.create_index(
-        'ix_kogan_dirty_au_true_only',
-        'kogan_sku_freight_fee',
-        ['sku_code'],
-        unique=False,
-        postgresql_where=sa.text('kogan_dirty_au = true')
+
+def upgrade() -> None:
+    # ADD COLUMN ... DEFAULT false 在 PG11+ 只改目录、不重写表；IF NOT EXISTS 让回填中途失败后可以重跑
+    op.execute(
+        "ALTER TABLE kogan_sku_freight_fee "
+        "ADD COLUMN IF NOT EXISTS kogan_dirty_au BOOLEAN DEFAULT false NOT NULL"
     )
-    op.create_index(
-        'ix_kogan_dirty_nz_true_only',
-        'kogan_sku_freight_fee',
-        ['sku_code'],
-        unique=False,
-        postgresql_where=sa.text('kogan_dirty_nz = true')
+    op.execute(
+        "ALTER TABLE kogan_sku_freight_fee "
+        "ADD COLUMN IF NOT EXISTS kogan_dirty_nz BOOLEAN DEFAULT false NOT NULL"
     )
 
-    op.drop_index('ix_kogan_dirty_true_only', table_name='kogan_sku_freight_fee')
-    op.drop_index('ix_kogan_dirty_source', table_name='kogan_sku_freight_fee')
-    op.drop_column('kogan_sku_freight_fee', 'kogan_dirty')
+    if context.is_offline_mode():
+        # --sql 只生成脚本，没法按返回结果循环：输出等价的一条 UPDATE
+        op.execute(
+            "UPDATE kogan_sku_freight_fee SET kogan_dirty_au = true, kogan_dirty_nz = true "
+            "WHERE kogan_dirty = true"
+        )
+        return
 
+    # 分批回填，每条 UPDATE 自动提交（不在迁移的大事务里）
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = ""
+        while True:
+            last, count = bind.execute(_BACKFILL_SQL, {"after": after, "lim": _BACKFILL_BATCH}).one()
+            if count < _BACKFILL_BATCH:
+                break
+            after = last
 
-def downgrade() -> None:
-    op.add_column(
-        'kogan_sku_freight_fee',
-        sa.Column('kogan_dirty', sa.Boolean(), nullable=False, server_default=sa.text('false')),
-    )
-    op.create_index(
-        'ix_kogan_dirty_true_only',
-        'kogan_sku_freight_fee',
-        ['sku_code'],
-        unique=False,
-        postgresql_where=sa.text('kogan_dirty = true')
-    )
+    # 新的部分索引、旧索引的删除以及 kogan_dirty 列的删除放到 c4d7e9a2b815 里：
+    # 那边用 CREATE/DROP INDEX CONCURRENTLY，不和这里的回填抢锁
 
-    op.create_index(
-        'ix_kogan_dirty_source',
-        'kogan_sku_freight_fee',
-        ['kogan_dirty', 'last_changed_source'],
-        unique=False,
-    )
-
-    op.drop_index('ix_kogan_dirty_au_true_only', table_name='kogan_sku_freight_fee')
-    op.drop_index('ix_kogan_dirty_nz_true_only', table_name='kogan_sku_freight_fee')
 
+def downgrade() -> None:
+    # kogan_dirty 列与旧索引由 c4d7e9a2b815 的 downgrade 恢复
     op.drop_column('kogan_sku_freight_fee', 'kogan_dirty_nz')
     op.drop_column('kogan_sku_freight_fee', 'kogan_dirty_au')
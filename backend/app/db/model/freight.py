@@ -43,7 +43,7 @@ class SkuFreightFee(Base):
 
     # —— 幂等&选择性重算 —— 
     # 表示上一次成功完成运费计算时那一刻入参字段的哈希（与 sku_info.attrs_hash_current 对比）成功后回写 last_calc := current
-    attrs_hash_last_calc: Mapped[Optional[str]] = mapped_column(String(128))
+    attrs_hash_last_calc: Mapped[Optional[str]] = mapped_column(String)
 
     # === 给 Kogan 导出用的变化标记 ===
     last_changed_run_id: Mapped[Optional[str]] = mapped_column(String(32), index=True, nullable=True)   # 关联freight_run_id 精准取本次产生变化的数据, String(32)，与 FreightRun.id 一致
@@ -69,6 +69,10 @@ class SkuFreightFee(Base):
             postgresql_where=text("kogan_dirty_nz = true")
         ),
         Index("ix_kogan_sku_freight_fee_shipping_type", "shipping_type"),
+        # 前端运费列表：SKU 前缀筛选 lower(sku_code) LIKE 'xx%'
+        Index("ix_kogan_sku_freight_fee_lower_sku_code", text("lower(sku_code) text_pattern_ops")),
+        # 前端运费列表默认排序 + 分页
+        Index("ix_kogan_sku_freight_fee_updated_sku", text("updated_at DESC NULLS LAST"), "sku_code"),
     )
 
 
@@ -49,7 +49,11 @@ class KoganExportJob(Base):
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
     row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
-    file_content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # deferred：ORM 加载 job（列表、回写、最近一次任务）时不带出整份文件；下载接口按块单独读取
+    # 列的 STORAGE 是 EXTERNAL（迁移 7d4a1f6b2c83）：行外存储、不做 TOAST 压缩，按块 substring 只读对应分片
+    file_content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, deferred=True)
+    # file_content 的压缩方式："gzip" 或 NULL（未压缩，旧数据）
+    content_encoding: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
 
     created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
     applied_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
@@ -99,7 +103,7 @@ class KoganExportJobSku(Base):
         String(64),
         ForeignKey("kogan_export_jobs.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
+        # 不单独建索引：按 job_id 查走 ix_kogan_export_job_skus_job_sku 的前缀
     )
     sku: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
     template_payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
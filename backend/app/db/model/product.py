@@ -87,7 +87,7 @@ class SkuInfo(Base):
         Index("idx_sku_info_variant_id", "shopify_variant_id"),
         # 特价回收任务：按结束日期筛选并按 SKU 输出
         Index("idx_sku_info_special_end_sku", "special_price_end_date", "sku_code"),
-        # 商品列表分页：ORDER BY updated_at DESC, sku_code
+        # 商品列表分页：ORDER BY updated_at DESC, sku_code DESC（反向扫描），keyset 游标走行比较
         Index("idx_sku_info_updated_sku", "updated_at", "sku_code"),
         # SKU 前缀 ILIKE 查询
         Index("idx_sku_info_lower_sku_code", func.lower(sku_code)),
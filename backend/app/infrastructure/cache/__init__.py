@@ -0,0 +1,6 @@
+
+"""
+  Read-through caches for rarely-changing lookup data.
+     from app.infrastructure.cache.product_tags import get_product_tags_body, bump_product_tags_version
+     from app.infrastructure.cache.schedules import get_schedules_body, invalidate_schedules
+"""
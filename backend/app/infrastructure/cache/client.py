@@ -0,0 +1,34 @@
+
+from __future__ import annotations
+
+try:
+    import redis  # type: ignore
+except Exception:
+    redis = None  # 没装 redis 时只用进程内缓存 / 直接查库
+
+from app.core.config import settings
+
+
+# 各缓存模块共用的 Redis 客户端：首次使用时按 REDIS_URL 懒加载，进程内复用同一个连接池
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is not None:
+        return _client
+    url = getattr(settings, "REDIS_URL", None)
+    if not (redis and url):
+        return None
+    try:
+        # 超时要短：缓存层慢了宁可直接查库；keepalive 避免空闲连接被中间设备悄悄断开
+        _client = redis.from_url(
+            url,
+            socket_timeout=0.2,
+            socket_connect_timeout=0.2,
+            socket_keepalive=True,
+            client_name="ys-hub",    # CLIENT LIST 里能认出是哪个服务的连接
+        )
+    except Exception:
+        return None
+    return _client
@@ -0,0 +1,77 @@
+
+from __future__ import annotations
+import time, logging
+from typing import Callable, List, Optional, Tuple
+
+import orjson
+
+from app.infrastructure.cache.client import get_redis as _redis
+from app.utils.http_cache import weak_etag
+
+
+logger = logging.getLogger(__name__)
+
+
+"""
+/products/tags 两级缓存（标签只在商品同步写 sku_info 时变化）：
+    1) 进程内：JSON bytes + ETag 缓存 LOCAL_TTL_SEC 秒，命中时不碰 Redis/DB
+    2) Redis：key = product:tags:v{N}，SETEX REDIS_TTL_SEC；多个 worker 共用一份
+失效：sku_info 写入后 INCR product:tags:ver（见 product_repo），旧版本 key 不再被读取、到期自动清理。
+Redis 未配置或不可用时静默降级为“进程内缓存 + DB”。
+"""
+LOCAL_TTL_SEC = 30
+REDIS_TTL_SEC = 300
+_VERSION_KEY = "product:tags:ver"
+_BODY_KEY = "product:tags:v{}"
+
+_local_cache: Optional[Tuple[float, bytes, str]] = None    # (写入时间, JSON bytes, ETag)
+
+
+def get_product_tags_body(loader: Callable[[], List[str]]) -> Tuple[bytes, str]:
+    global _local_cache
+    now = time.monotonic()
+    cached = _local_cache
+    if cached and now - cached[0] < LOCAL_TTL_SEC:
+        return cached[1], cached[2]
+
+    client = _redis()
+    body_key = None
+    if client is not None:
+        try:
+            version = client.get(_VERSION_KEY) or b"0"
+            body_key = _BODY_KEY.format(version.decode())
+            body = client.get(body_key)
+            if body is not None:
+                return _remember(now, body)
+        except Exception:
+            logger.warning("product tags cache: redis read failed, falling back to DB", exc_info=True)
+            client = None
+
+    body = orjson.dumps(list(loader()))
+    if client is not None and body_key is not None:
+        try:
+            client.setex(body_key, REDIS_TTL_SEC, body)
+        except Exception:
+            logger.warning("product tags cache: redis write failed", exc_info=True)
+    return _remember(now, body)
+
+
+# 写进进程内缓存；ETag 按内容算，各 worker 对同一份标签给出相同 ETag
+def _remember(now: float, body: bytes) -> Tuple[bytes, str]:
+    global _local_cache
+    etag = weak_etag(body)
+    _local_cache = (now, body, etag)
+    return body, etag
+
+
+# sku_info 的 product_tags 可能变化时调用；其他进程的本地缓存最多再用 LOCAL_TTL_SEC 秒
+def bump_product_tags_version() -> None:
+    global _local_cache
+    _local_cache = None
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.incr(_VERSION_KEY)
+    except Exception:
+        logger.warning("product tags cache: redis version bump failed", exc_info=True)
@@ -0,0 +1,52 @@
+
+from __future__ import annotations
+import logging
+from typing import Any, Callable, List
+
+import orjson
+
+from app.infrastructure.cache.client import get_redis as _redis
+
+
+logger = logging.getLogger(__name__)
+
+
+"""
+GET /schedules 的响应缓存（只在 PUT /schedules/{key} 时变化）：
+    Redis key = schedules:all，存序列化好的 JSON bytes，SETEX TTL_SEC；多个 worker 共用一份
+失效：upsert 提交后 DEL；TTL 只是兜底（例如有人直接改库）。
+不做进程内缓存：DEL 只能通知到 Redis，进程内副本会让其他 worker 读到旧配置。
+Redis 未配置或不可用时静默降级为直接查库。
+"""
+TTL_SEC = 60
+_KEY = "schedules:all"
+
+
+def get_schedules_body(loader: Callable[[], List[Any]]) -> bytes:
+    client = _redis()
+    if client is not None:
+        try:
+            body = client.get(_KEY)
+            if body is not None:
+                return body
+        except Exception:
+            logger.warning("schedules cache: redis read failed, falling back to DB", exc_info=True)
+            client = None
+
+    body = orjson.dumps(loader())
+    if client is not None:
+        try:
+            client.setex(_KEY, TTL_SEC, body)
+        except Exception:
+            logger.warning("schedules cache: redis write failed", exc_info=True)
+    return body
+
+
+def invalidate_schedules() -> None:
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.delete(_KEY)
+    except Exception:
+        logger.warning("schedules cache: redis delete failed", exc_info=True)
@@ -95,7 +95,7 @@ class RedisTokenBucketLimiter:
             logging.getLogger(__name__).warning("Global RL disabled (no redis or url).")
             return None
         
-        r = redis.from_url(url, decode_responses=True)
+        r = redis.from_url(url, decode_responses=True, socket_keepalive=True, client_name="ys-hub")
         prefix = getattr(settings, "DSZ_GLOBAL_RL_KEY_PREFIX", "dsz:rl")
         env = getattr(settings, "DSZ_ENV", "dev")
         acct = (account or "account").replace("@", "_at_")
@@ -6,8 +6,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import api_v1
 from app.core.logging import configure_logging
+from app.core.fastapi_patches import install_dependency_introspection_cache
 
 configure_logging()
+install_dependency_introspection_cache()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title=settings.PROJECT_NAME)
@@ -3,6 +3,8 @@
 from __future__ import annotations
 from typing import Dict, Any
 from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.model.freight_cal_config import FreightCalcConfig
 
@@ -86,6 +88,19 @@ def get_or_create_config(db: Session) -> FreightCalcConfig:
     return row
 
 
+async def get_or_create_config_async(db: AsyncSession) -> FreightCalcConfig:
+    # 与 get_or_create_config 相同逻辑，给 async 路由用
+    row = await db.scalar(select(FreightCalcConfig).order_by(FreightCalcConfig.id.asc()).limit(1))
+    if row:
+        return row
+
+    row = FreightCalcConfig(**DEFAULTS)
+    db.add(row)
+    await db.commit()
+    await db.refresh(row)
+    return row
+
+
 def to_dict(row: FreightCalcConfig) -> Dict[str, Any]:
     """
     将 ORM 行转为 dict（仅导出受支持字段）。
@@ -113,6 +128,19 @@ def update_config(db: Session, payload: Dict[str, Any]) -> FreightCalcConfig:
 
 
 
+async def update_config_async(db: AsyncSession, payload: Dict[str, Any]) -> FreightCalcConfig:
+    """
+    update_config 的 async 版本。
+    """
+    row = await get_or_create_config_async(db)
+    for k, v in payload.items():
+        if k in ALL_FIELDS:
+            setattr(row, k, v)
+    await db.commit()
+    await db.refresh(row)
+    return row
+
+
 # ------- 查询接口（便于上层直接拿到配置） -------
 def get_config_row(db: Session) -> FreightCalcConfig:
     """
@@ -2,14 +2,16 @@
 # 运费计算结果相关的 DB 操作
 
 from __future__ import annotations
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from decimal import Decimal
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple, Any
 import json
 
 import sqlalchemy as sa
 from sqlalchemy import select, text, Numeric, Boolean, DateTime as SA_DateTime, Integer, Float
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.model.product import SkuInfo, ProductSyncCandidate   # 商品信息表
@@ -21,8 +23,8 @@ from app.utils.attrs_hash import FREIGHT_HASH_FIELDS             # 作为“运
 FREIGHT_RELEVANT_FIELDS: set[str] = set(FREIGHT_HASH_FIELDS)
 
 
-"""针对前端运费列表的查询方法"""
-def fetch_shipping_types(db: Session) -> List[str]:
+"""针对前端运费列表的查询方法（async 路由调用，走 AsyncSession）"""
+async def fetch_shipping_types(db: AsyncSession) -> List[str]:
     """
     从 kogan_sku_freight_fee 表中查询去重后的 shipping_type。
     仅返回非空值，并按字母顺序排序。
@@ -36,57 +38,85 @@ def fetch_shipping_types(db: Session) -> List[str]:
          ORDER BY shipping_type
         """
     )
-    return db.execute(sql).scalars().all()
+    return (await db.execute(sql)).scalars().all()
 
 
-def fetch_freight_results_page(
-    db: Session,
+async def fetch_freight_results_page(
+    db: AsyncSession,
     *,
     sku_prefix: Optional[str],
     tags: Optional[List[str]],
     shipping_types: Optional[List[str]],
     page: int,
     page_size: int,
-) -> tuple[List[Dict[str, Any]], int]:
+) -> tuple[List[sa.Row], int]:
     """
     根据筛选条件分页查询运费结果。
-    返回 (rows, total)，其中 rows 是字段名与前端展示保持一致的字典列表。
+    返回 (rows, total)，rows 是 SQLAlchemy Row（按 SELECT 列顺序，可直接位置解包），
+    列顺序见 _freight_results_stmts，最后一列 total_count 供分页使用。
     """
-
-    conditions: List[str] = ["1=1"]
     params: Dict[str, Any] = {}
 
     if sku_prefix:
-        conditions.append("f.sku_code ILIKE :sku_prefix")
-        params["sku_prefix"] = f"{sku_prefix}%"
-
-    if shipping_types:
-        values = [s.strip() for s in shipping_types if s and s.strip()]
-        if values:
-            placeholders: List[str] = []
-            for idx, value in enumerate(values):
-                key = f"st_{idx}"
-                placeholders.append(f":{key}")
-                params[key] = value
-            conditions.append(f"f.shipping_type IN ({', '.join(placeholders)})")
-
-    if tags:
-        lowered = [t.strip().lower() for t in tags if t and t.strip()]
-        if lowered:
-            placeholders: List[str] = []
-            for idx, value in enumerate(lowered):
-                key = f"tag_{idx}"
-                placeholders.append(f":{key}")
-                params[key] = value
-            conditions.append(
-                f"""
-                EXISTS (
-                    SELECT 1
-                      FROM jsonb_array_elements_text(si.product_tags) AS elem(tag_value)
-                     WHERE lower(elem.tag_value) IN ({', '.join(placeholders)})
-                )
-                """
+        params["sku_prefix"] = escape_like(sku_prefix.lower()) + "%"
+
+    st_values = [s.strip() for s in (shipping_types or []) if s and s.strip()]
+    if st_values:
+        params["shipping_types"] = st_values
+
+    tag_values = [t.strip().lower() for t in (tags or []) if t and t.strip()]
+    if tag_values:
+        params["tags"] = tag_values
+
+    data_sql, count_sql = _freight_results_stmts(bool(sku_prefix), bool(st_values), bool(tag_values))
+
+    offset = (page - 1) * page_size
+    data_params = params.copy()
+    data_params.update({"limit": page_size, "offset": offset})
+    rows = (await db.execute(data_sql, data_params)).all()
+
+    # total 随数据一起返回（COUNT(*) OVER()），一次往返；翻页超出末尾时才单独补一次 COUNT
+    if rows:
+        total = rows[0].total_count
+    elif offset > 0:
+        total = (await db.execute(count_sql, params)).scalar_one()
+    else:
+        total = 0
+
+    return rows, total
+
+
+"""
+按“启用了哪些筛选”构建 (data_sql, count_sql)，每种组合只构建一次（最多 8 种）。
+SQL 文本固定 → SQLAlchemy 编译缓存稳定命中；shipping_type 用 expanding IN，
+不会因为选了几个值而生成不同的 SQL。
+"""
+@lru_cache(maxsize=None)
+def _freight_results_stmts(
+    has_sku_prefix: bool, has_shipping_types: bool, has_tags: bool,
+) -> Tuple[sa.TextClause, sa.TextClause]:
+    conditions: List[str] = ["1=1"]
+    expanding: List[sa.BindParameter] = []
+
+    if has_sku_prefix:
+        # lower(...) LIKE 'xx%' 能走 ix_kogan_sku_freight_fee_lower_sku_code（text_pattern_ops），ILIKE 不行
+        conditions.append("lower(f.sku_code) LIKE :sku_prefix ESCAPE '\\'")
+
+    if has_shipping_types:
+        conditions.append("f.shipping_type IN :shipping_types")
+        expanding.append(sa.bindparam("shipping_types", expanding=True))
+
+    if has_tags:
+        # 任意一个 tag 命中，大小写不敏感（传入值已转小写）
+        conditions.append(
+            """
+            EXISTS (
+                SELECT 1
+                  FROM jsonb_array_elements_text(si.product_tags) AS elem(tag_value)
+                 WHERE lower(elem.tag_value) = ANY(CAST(:tags AS text[]))
             )
+            """
+        )
 
     where_sql = " AND ".join(conditions)
     base_sql = f"""
@@ -95,10 +125,7 @@ def fetch_freight_results_page(
        WHERE {where_sql}
     """
 
-    total_sql = text(f"SELECT COUNT(*) {base_sql}")
-    total = db.execute(total_sql, params).scalar_one()
-
-    offset = (page - 1) * page_size
+    # ⚠️ 列顺序与 api/v1/freight.py::_build_freight_row 的位置解包一一对应，改动需同步
     data_sql = text(
         f"""
         SELECT
@@ -124,18 +151,24 @@ def fetch_freight_results_page(
             f.kogan_nz_price,
             f.updated_at,
             COALESCE(si.product_tags, '[]'::jsonb) AS product_tags,
-            si.price AS cost
+            si.price AS cost,
+            COUNT(*) OVER() AS total_count
           {base_sql}
          ORDER BY f.updated_at DESC NULLS LAST, f.sku_code ASC
          LIMIT :limit OFFSET :offset
         """
     )
+    count_sql = text(f"SELECT COUNT(*) {base_sql}")
+
+    if expanding:
+        data_sql = data_sql.bindparams(*expanding)
+        count_sql = count_sql.bindparams(*expanding)
+    return data_sql, count_sql
 
-    data_params = params.copy()
-    data_params.update({"limit": page_size, "offset": offset})
-    rows = db.execute(data_sql, data_params).mappings().all()
 
-    return [dict(row) for row in rows], total
+"""转义 LIKE 通配符（配合 ESCAPE '\\'），用户输入的 % / _ 按字面匹配"""
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 
@@ -495,7 +528,7 @@ def finish_freight_run(db, run_id: str, status: str,
 
     run.status = status
     run.changed_count = changed_count
-    run.finished_at = datetime.utcnow()
+    run.finished_at = datetime.now(timezone.utc)    # timestamptz：带时区写入，不依赖会话时区
 
     if message:
         # 防御性截断，避免极端长字符串
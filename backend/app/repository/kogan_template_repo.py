@@ -2,9 +2,11 @@
 from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from app.db.model.freight import SkuFreightFee
@@ -97,6 +99,7 @@ def create_export_job(
     row_count: int,
     created_by: Optional[int],
     sku_records: Sequence[dict],
+    content_encoding: Optional[str] = None,
 ) -> KoganExportJob:
     
     job = KoganExportJob(
@@ -107,6 +110,7 @@ def create_export_job(
         file_size=len(file_bytes),
         row_count=row_count,
         file_content=file_bytes,
+        content_encoding=content_encoding,
         created_by=created_by,
         exported_at=datetime.now(timezone.utc),
     )
@@ -132,7 +136,7 @@ def create_export_job(
 
 
 
-# 获取导出任务及其文件内容；找不到则抛错
+# 获取导出任务及其 skus（file_content 是 deferred 列，不随之加载）
 def get_export_job(db: Session, job_id: str) -> Optional[KoganExportJob]:
     return (
         db.query(KoganExportJob)
@@ -143,11 +147,51 @@ def get_export_job(db: Session, job_id: str) -> Optional[KoganExportJob]:
 
 
 
-# 获取最近一次的导出任务记录（不含文件内容）
+# 下载用：只取响应头需要的元数据和文件字节数（octet_length），不读 file_content、不加载 skus
+async def get_export_job_file_meta(db: AsyncSession, job_id: str) -> Optional[Row]:
+    stmt = select(
+        KoganExportJob.id,
+        KoganExportJob.file_name,
+        KoganExportJob.row_count,
+        KoganExportJob.status,
+        KoganExportJob.country_type,
+        KoganExportJob.applied_at,
+        KoganExportJob.exported_at,
+        KoganExportJob.content_encoding,
+        func.coalesce(func.octet_length(KoganExportJob.file_content), 0).label("content_length"),
+    ).where(KoganExportJob.id == job_id)
+    return (await db.execute(stmt)).one_or_none()
+
+
+"""
+按块读取导出文件：每次 substring(file_content FROM offset FOR chunk_size)（列是 STORAGE EXTERNAL，只取对应的 TOAST 分片），
+只把这一块从 Postgres 传到应用，内存占用与文件大小无关
+"""
+async def iter_export_job_file_chunks(
+    db: AsyncSession,
+    job_id: str,
+    *,
+    total_bytes: int,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    offset = 0
+    while offset < total_bytes:
+        chunk = await db.scalar(
+            select(func.substring(KoganExportJob.file_content, offset + 1, chunk_size))
+            .where(KoganExportJob.id == job_id)
+        )
+        if not chunk:
+            return
+        # psycopg 返回的 bytea 已是 bytes（或 memoryview），StreamingResponse / zlib 都直接接受，不再复制一份
+        yield chunk
+        offset += len(chunk)
+
+
+
+# 获取最近一次的导出任务记录（不含文件内容；只用于 serialize_export_job，不加载 skus）
 def fetch_latest_export_job(db: Session, country_type: str) -> Optional[KoganExportJob]:
     return (
         db.query(KoganExportJob)
-        .options(selectinload(KoganExportJob.skus))
         .filter(KoganExportJob.country_type == country_type)
         .order_by(KoganExportJob.exported_at.desc())
         .first()
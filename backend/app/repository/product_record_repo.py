@@ -3,33 +3,89 @@ from __future__ import annotations
 from typing import List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import Text, cast, select, func
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.db.model.product import ProductSyncRun, ProductSyncChunk
 
 
+"""
+列表页只按列取值，返回 Row（不建 ORM 实例、不进 identity map、也不会触发懒加载）；
+列名即接口字段名（ProductSyncRunOut / ProductSyncChunkOut），路由层直接 row._asdict()
+最后一列 total_count = COUNT(*) OVER()：总数随数据一起返回，一次往返
+"""
+_RUN_PAGE_COLUMNS = (
+    ProductSyncRun.id,
+    ProductSyncRun.run_type,
+    ProductSyncRun.status,
+    ProductSyncRun.shopify_bulk_id,
+    ProductSyncRun.shopify_bulk_status,
+    ProductSyncRun.shopify_bulk_url,
+    ProductSyncRun.total_shopify_skus,
+    ProductSyncRun.changed_count,
+    ProductSyncRun.note,
+    ProductSyncRun.started_at,
+    ProductSyncRun.finished_at,
+    ProductSyncRun.webhook_received_at,
+    ProductSyncRun.created_at,
+    ProductSyncRun.updated_at,
+)
+
+
+# 三个 *_sku_list 是 JSONB 数组（NOT NULL），按 JSON 文本取回：
+# 不经 psycopg 解析成 Python list，路由层用 orjson.Fragment 原样嵌进响应
+CHUNK_JSON_TEXT_FIELDS = ("dsz_missing_sku_list", "dsz_failed_sku_list", "dsz_extra_sku_list")
+
+
+# sku_codes 是整片的 SKU 数组（可达数千个），接口不返回，不从库里取
+_CHUNK_PAGE_COLUMNS = (
+    ProductSyncChunk.run_id,
+    ProductSyncChunk.chunk_idx,
+    ProductSyncChunk.status,
+    ProductSyncChunk.sku_count,
+    ProductSyncChunk.dsz_missing,
+    ProductSyncChunk.dsz_failed_skus,
+    ProductSyncChunk.dsz_requested_total,
+    ProductSyncChunk.dsz_returned_total,
+    *(cast(getattr(ProductSyncChunk, name), Text).label(name) for name in CHUNK_JSON_TEXT_FIELDS),
+    ProductSyncChunk.started_at,
+    ProductSyncChunk.finished_at,
+    ProductSyncChunk.last_error,
+)
+
+
+_TOTAL_COUNT = func.count().over().label("total_count")
+
+
+# 有数据时 total 取自窗口列；翻页超出末尾（有 offset 却没行）才单独补一次 COUNT
+def _page_total(db: Session, rows: List[Row], offset: int, count_stmt) -> int:
+    if rows:
+        return rows[0].total_count
+    if offset > 0:
+        return db.scalar(count_stmt) or 0
+    return 0
+
+
 def fetch_product_sync_runs_page(
     db: Session,
     *,
     page: int,
     page_size: int,
-) -> Tuple[List[ProductSyncRun], int]:
+) -> Tuple[List[Row], int]:
     """分页查询 product_sync_runs，按创建时间倒序返回"""
 
     offset = (page - 1) * page_size
 
-    total_stmt = select(func.count()).select_from(ProductSyncRun)
-    total = db.scalar(total_stmt) or 0
-
     rows_stmt = (
-        select(ProductSyncRun)
+        select(*_RUN_PAGE_COLUMNS, _TOTAL_COUNT)
         .order_by(ProductSyncRun.created_at.desc())
         .offset(offset)
         .limit(page_size)
     )
-    rows = list(db.scalars(rows_stmt))
+    rows = db.execute(rows_stmt).all()
 
+    total = _page_total(db, rows, offset, select(func.count()).select_from(ProductSyncRun))
     return rows, total
 
 
@@ -39,20 +95,18 @@ def fetch_product_sync_chunks_page(
     page: int,
     page_size: int,
     run_id: Optional[UUID] = None,
-) -> Tuple[List[ProductSyncChunk], int]:
+) -> Tuple[List[Row], int]:
     """分页查询 product_sync_chunks，可按 run_id 过滤"""
 
     offset = (page - 1) * page_size
 
-    base_stmt = select(ProductSyncChunk)
+    base_stmt = select(*_CHUNK_PAGE_COLUMNS, _TOTAL_COUNT)
     count_stmt = select(func.count()).select_from(ProductSyncChunk)
 
     if run_id:
         base_stmt = base_stmt.where(ProductSyncChunk.run_id == run_id)
         count_stmt = count_stmt.where(ProductSyncChunk.run_id == run_id)
 
-    total = db.scalar(count_stmt) or 0
-
     rows_stmt = (
         base_stmt
         .order_by(
@@ -62,6 +116,7 @@ def fetch_product_sync_chunks_page(
         .offset(offset)
         .limit(page_size)
     )
-    rows = list(db.scalars(rows_stmt))
+    rows = db.execute(rows_stmt).all()
 
+    total = _page_total(db, rows, offset, count_stmt)
     return rows, total
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from datetime import datetime, date, time, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Iterable, Optional, Dict, Any, List, Iterator, Tuple, Set
+from typing import Iterable, Optional, Dict, Any, List, Iterator, Sequence, Tuple, Set
 from decimal import Decimal
 import io, csv
 import math
@@ -22,7 +22,9 @@ from sqlalchemy.orm.attributes import QueryableAttribute
 from decimal import Decimal
 
 from app.db.model.product import SkuInfo, ProductSyncCandidate, ProductSyncChunk
+from app.db.session import SessionLocal
 from app.utils.serialization import format_product_tags
+from app.infrastructure.cache.product_tags import bump_product_tags_version
 
 
 '''
@@ -265,13 +267,17 @@ def fetch_products_page(
     db: Session,
     *,
     sku_prefix: Optional[str],
-    tags: Optional[List[str]],
+    tags: Optional[Sequence[str]],
     page: int,
     page_size: int,
-) -> tuple[List[Dict[str, Any]], int]:
+    cursor: Optional[Tuple[datetime, str]] = None,
+) -> tuple[List[Dict[str, Any]], Optional[int]]:
     """
     根据筛选条件分页查询 sku_info。
     返回 (rows, total)；rows 是 dict 列表，字段与 Product 响应模型对齐。
+    rows 最多 page_size + 1 条：多取的一条只用来判断是否还有下一页，由调用方截掉。
+    cursor=(updated_at, sku_code) 时走 keyset 翻页：从该行之后开始取，忽略 page，
+    深翻页也只扫 page_size 行；此时不统计 total（返回 None，首页已经拿到过）。
     """
     conditions = ["1=1"]
     params: Dict[str, Any] = {}
@@ -302,10 +308,16 @@ def fetch_products_page(
     where_sql = " AND ".join(conditions)
     base_sql = f"FROM sku_info WHERE {where_sql}"
 
-    total_sql = f"SELECT COUNT(*) {base_sql}"
-    total = db.execute(text(total_sql), params).scalar_one()
-
+    # 排序两列同为 DESC，可以直接反向扫描 idx_sku_info_updated_sku (updated_at, sku_code)；
+    # updated_at NOT NULL，游标条件写成行比较，才能作为索引的范围条件（OR 拼的条件只能逐行过滤）
+    seek_sql = ""
+    total_sql = ",\n            COUNT(*) OVER() AS total_count"
     offset = (page - 1) * page_size
+    if cursor is not None:
+        params["cur_ts"], params["cur_sku"] = cursor
+        seek_sql = "AND (updated_at, sku_code) < (:cur_ts, :cur_sku)"
+        total_sql = ""
+        offset = 0
     data_sql = text(
         f"""
         SELECT
@@ -345,17 +357,30 @@ def fetch_products_page(
             freight_vic_r,
             freight_wa_m,
             freight_wa_r,
-            freight_nz
-          {base_sql}
-         ORDER BY updated_at DESC NULLS LAST, sku_code ASC
+            freight_nz{total_sql}
+          {base_sql} {seek_sql}
+         ORDER BY updated_at DESC, sku_code DESC
          LIMIT :limit OFFSET :offset
         """
     )
 
     data_params = params.copy()
-    data_params.update({"limit": page_size, "offset": offset})
-    rows = db.execute(data_sql, data_params).mappings().all()
-    return [dict(r) for r in rows], total
+    data_params.update({"limit": page_size + 1, "offset": offset})
+    rows = [dict(r) for r in db.execute(data_sql, data_params).mappings()]
+
+    if cursor is not None:
+        return rows, None
+
+    # total 随数据一起返回（COUNT(*) OVER()），同一次扫描、一次往返；翻页超出末尾时才单独补一次 COUNT
+    if rows:
+        total = rows[0]["total_count"]
+        for r in rows:
+            del r["total_count"]
+    elif offset > 0:
+        total = db.execute(text(f"SELECT COUNT(*) {base_sql}"), params).scalar_one()
+    else:
+        total = 0
+    return rows, total
 
 
 # ========= 读取 sku 的现有快照 =========
@@ -483,6 +508,8 @@ def bulk_upsert_sku_info(db, rows: list[dict], *, only_update_when_changed: bool
                 update_columns=SYNC_FIELDS,
                 extra_updates={"updated_at": now_expr, "last_changed_at": now_expr},
             )
+            # product_tags 在 SYNC_FIELDS 里：有行写入就让 /products/tags 缓存失效（TTL 兜底提交前后的竞态）
+            bump_product_tags_version()
     except Exception:
         logger.exception(
             "bulk_upsert_sku_info failed: rows=%d only_update=%s sample=%s",
@@ -602,6 +629,8 @@ def purge_sku_info_absent_from(db: Session, keep_skus: Iterable[str]) -> List[st
         """
     )
     deleted = db.execute(sql, {"keep_skus": keep_list}).scalars().all()
+    if deleted:
+        bump_product_tags_version()
     return list(deleted)
 
 
@@ -724,45 +753,28 @@ def list_today_changed_skus(db, tz_name="Australia/Melbourne"):
 
 
 # ======== 导出商品列表为 CSV（流式） =========
+# 服务端游标每次取的行数；writerows 也按这个批量写
+_PRODUCT_EXPORT_FETCH_ROWS = 1000
+_PRODUCT_TAGS_IDX = _PRODUCT_EXPORT_COLUMNS.index("product_tags")
+
+
 def export_products_csv_iter(
-    *, db=None, sku_prefix: Optional[str] = None, tags_csv: Optional[str] = None,
-    prefer_sql: bool = True, flush_bytes: int = 64 * 1024,
+    *, sku_prefix: Optional[str] = None, tags_csv: Optional[str] = None,
+    flush_bytes: int = 64 * 1024,
 ):
 
     return export_products_csv_iter_sql(
-        db, sku_prefix=sku_prefix, tags_csv=tags_csv, flush_bytes=flush_bytes
+        sku_prefix=sku_prefix, tags_csv=tags_csv, flush_bytes=flush_bytes
     )
 
 
 
 
-# ========= 内存中过滤商品列表（给 /products 导出mock 用） =========
-def _filter_products_in_memory(
-    rows: Iterable[Dict[str, Any]],
-    sku_prefix: Optional[str],
-    tags_csv: Optional[str],
-) -> List[Dict[str, Any]]:
-    data = list(rows)
-    if sku_prefix:
-        p = sku_prefix.lower()
-        data = [r for r in data if (r.get("sku_code") or "").lower().startswith(p)]
-    if tags_csv:
-        wanted = {t.strip().lower() for t in tags_csv.split(",") if t.strip()}
-        if wanted:
-            data = [
-                r for r in data
-                if any((tg or "").lower() in wanted for tg in (r.get("tags") or []))
-            ]
-    return data
-
-
-
-
 '''
   DB 版（PostgreSQL 原生 SQL 流式；与 SkuInfo 表字段对齐
+  会话与游标的用法见 app/db/session.py 里流式响应的约定
 '''
 def export_products_csv_iter_sql(
-    db,
     *, sku_prefix: Optional[str], tags_csv: Optional[str],
     flush_bytes: int = 64 * 1024,
 ):
@@ -792,29 +804,34 @@ def export_products_csv_iter_sql(
     ORDER BY sku_code
     """
 
-    conn = db.connection()
-    rs = conn.execution_options(stream_results=True).execute(text(sql), params)
-
     buf = io.StringIO()
     w = csv.writer(buf)
     w.writerow(_PRODUCT_CSV_HEADERS)
     yield buf.getvalue(); buf.seek(0); buf.truncate(0)
 
-    keys = rs.keys()
-    for rec in rs:
-        d = dict(zip(keys, rec))
-        d["product_tags"] = format_product_tags(d.get("product_tags"))
-        # special_price_end_date/updated_at 让数据库按默认文本输出（或自行格式化）
-        w.writerow([d.get(k) for k in _PRODUCT_EXPORT_COLUMNS])
-
-        if buf.tell() >= flush_bytes:
-            yield buf.getvalue(); buf.seek(0); buf.truncate(0)
+    with SessionLocal() as db:
+        rs = db.execute(
+            text(sql), params,
+            execution_options={"stream_results": True, "yield_per": _PRODUCT_EXPORT_FETCH_ROWS},
+        )
+        for partition in rs.partitions():
+            w.writerows(map(_product_export_row, partition))
+            if buf.tell() >= flush_bytes:
+                yield buf.getvalue(); buf.seek(0); buf.truncate(0)
 
     left = buf.getvalue()
     if left:
         yield left
 
 
+# 单行：SELECT 列顺序即 CSV 列顺序，按位置改写 product_tags，不再逐行建 dict
+# special_price_end_date/updated_at 由 csv 按 str() 输出
+def _product_export_row(row) -> list:
+    out = list(row)
+    out[_PRODUCT_TAGS_IDX] = format_product_tags(out[_PRODUCT_TAGS_IDX])
+    return out
+
+
 
 
 """
@@ -6,8 +6,8 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Dict, Iterable, Literal, Optional
 
-from sqlalchemy import insert, select, update
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.db.model.schedule import Schedule
@@ -44,48 +44,29 @@ def upsert(db: Session, key: str, dto: ScheduleUpsertDTO) -> Schedule:
     _validate(dto)
     now = datetime.now(timezone.utc)
 
-    upd = (
-        update(Schedule)
-        .where(Schedule.key == key)
-        .values(
-            enabled=dto.enabled,
-            day_of_week=dto.day_of_week,
-            hour=dto.hour,
-            minute=dto.minute,
-            every_2_weeks=dto.every_2_weeks,
-            timezone=dto.timezone,
-            updated_at=now,
-        )
+    # INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING：一条语句完成，
+    # 没有先 UPDATE 再 INSERT 的两次往返，也不用事后再 SELECT 一次拿行；并发写入也不会撞主键
+    stmt = pg_insert(Schedule).values(
+        key=key,
+        enabled=dto.enabled,
+        day_of_week=dto.day_of_week,
+        hour=dto.hour,
+        minute=dto.minute,
+        every_2_weeks=dto.every_2_weeks,
+        timezone=dto.timezone,
+        created_at=now,
+        updated_at=now,
     )
-    res = db.execute(upd)
-    if res.rowcount:
-        db.commit()
-        row = get(db, key)
-        assert row is not None
-        return row
-
-    try:
-        ins = insert(Schedule).values(
-            key=key,
-            enabled=dto.enabled,
-            day_of_week=dto.day_of_week,
-            hour=dto.hour,
-            minute=dto.minute,
-            every_2_weeks=dto.every_2_weeks,
-            timezone=dto.timezone,
-            created_at=now,
-            updated_at=now,
-        )
-        db.execute(ins)
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        db.execute(upd)
-        db.commit()
-
-    row = get(db, key)
-    if row is None:
-        raise RuntimeError(f"failed to upsert schedule {key}")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Schedule.key],
+        set_={
+            col: getattr(stmt.excluded, col)
+            for col in ("enabled", "day_of_week", "hour", "minute", "every_2_weeks", "timezone", "updated_at")
+        },
+    ).returning(Schedule)
+    # populate_existing：同一会话里若已加载过该行，用 RETURNING 的新值覆盖
+    row = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    db.commit()
     return row
 
 
@@ -2,7 +2,7 @@
 from __future__ import annotations
 import json
 from typing import List, Dict, Any, Tuple
-from datetime import datetime, timedelta
+from datetime import timedelta
 import time, logging
 
 from sqlalchemy.orm import Session
@@ -124,12 +124,12 @@ def enqueue_shopify_jobs(db: Session, jobs: List[Dict[str, Any]]) -> int:
     """
     只负责把待派发作业写入 ShopifyUpdateJob；不做业务判断。
     建议你的唯一键为 (sku_code, op, hash) 或业务允许的约束；下面示例用 do_nothing 防止重复。
-    jobs 形如：{"sku": "...", "metafields": [...], "available_at": datetime.utcnow(), ...}
+    jobs 形如：{"sku": "...", "metafields": [...], "available_at": now_utc(), ...}
     """
     if not jobs:
         return 0
     rows = []
-    now = datetime.utcnow()
+    now = now_utc()
     for j in jobs:
         rows.append({
             "id": __import__("uuid").uuid4().hex,
@@ -1,5 +1,7 @@
 
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.db.model.user import User
@@ -15,6 +17,10 @@ def get_by_username(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
 
+async def get_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    return await db.scalar(select(User).where(User.username == username).limit(1))
+
+
 def create_user(db: Session, username: str, hashed_password: str,
                 full_name: str | None = None, is_superuser: bool = False) -> User:
     user = User(
@@ -2,12 +2,12 @@
 import logging
 
 from fastapi import Depends, HTTPException, status, Request, Response
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.security import verify_password, create_access_token, decode_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.core.security import verify_password_async, create_access_token, decode_token
 from app.core.config import settings
 from app.db.model.user import User
-from app.repository.user_repo import get_by_username
+from app.repository.user_repo import get_by_username_async
 
 
 logger = logging.getLogger(__name__)
@@ -62,9 +62,10 @@ def clear_cookie(response):
     1) 签发 Access Token（JWT）并写入 HttpOnly Cookie（Secure + SameSite=None）
     2) 生成可读的 csrf_token Cookie（非 HttpOnly），用于双提交校验
     3) 有效期：默认 8 小时（可通过 settings.ACCESS_TOKEN_EXPIRE_MINUTES 配置为 480/720）
+    - async：查用户走 AsyncSession，bcrypt 校验丢到专用线程池（见 core/security.py）
 '''
-def login_user(response: Response, db: Session, username: str, password: str) -> User:
-    user = authenticate_user(db, username, password)
+async def login_user(response: Response, db: AsyncSession, username: str, password: str) -> User:
+    user = await authenticate_user(db, username, password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
@@ -85,11 +86,11 @@ def login_user(response: Response, db: Session, username: str, password: str) ->
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> User | None:
-    user = get_by_username(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> User | None:
+    user = await get_by_username_async(db, username)
     if not user or not user.is_active:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -98,8 +99,10 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
 获取当前登录用户
     - 从 Cookie 里拿到 token → decode_token(...) 
     - 读出 user_id，没有去 Redis/DB 用 sessionId 回表找用户会话
+    - async：所有受保护路由都会走这里，JWT 解码是纯 CPU 的轻活，直接在事件循环里做；
+      查用户走 AsyncSession，省掉每个请求一次线程池切换
 '''
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_async_db)) -> User:
 
     has_cookie = COOKIE_NAME in request.cookies
     logger.debug("get_current_user: cookie_name=%s has_cookie=%s", COOKIE_NAME, has_cookie)
@@ -107,23 +110,23 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     """从 Cookie 取出 JWT 并校验"""
     raw = request.cookies.get(COOKIE_NAME)
     if not raw:
-        print(f"get_current_user: missing {COOKIE_NAME} cookie, headers={dict(request.headers)}")
+        logger.info("get_current_user: missing %s cookie", COOKIE_NAME)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     payload = decode_token(raw)
     if not payload or "user_id" not in payload:
         logger.warning("get_current_user: invalid token payload, headers=%s", dict(request.headers))
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
-    user = db.get(User, payload["user_id"])
+    user = await db.get(User, payload["user_id"])
     if not user or not user.is_active:
         logger.warning("get_current_user: user %s disabled or not found", payload.get("user_id"))
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User disabled")
-    
+    # 结束只读事务，连接立刻还回 async 池，不在整个请求期间占着（expire_on_commit=False，user 仍可用）
+    await db.commit()
+
     # 关键：成功路径打印一行你要看的 id/username（还带上 IP/UA，排查更方便）
     client_ip = getattr(request.client, "host", "?")
     ua = request.headers.get("user-agent", "?")
     logger.info("get_current_user OK: user_id=%s username=%s ip=%s ua=%s", user.id, user.username, client_ip, ua)
-    # 若想在 docker 日志里更直观，也可以再来一行 print（可选）
-    print(f"[auth] get_current_user OK: user_id={user.id} username={user.username} ip={client_ip}")
 
     return user
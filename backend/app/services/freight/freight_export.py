@@ -4,12 +4,12 @@ from __future__ import annotations
 import io
 import csv
 import json
-from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import text
-from sqlalchemy.orm import Session
 
+from app.db.session import AsyncSessionLocal
+from app.repository.freight_repo import escape_like
 from app.utils.serialization import format_product_tags
 
 
@@ -37,7 +37,8 @@ _EXPORT_COLUMNS_SQL = [
     "f.weight",
     "COALESCE(si.product_tags, '[]'::jsonb) AS product_tags",
     "f.attrs_hash_last_calc",
-    "f.updated_at",
+    # 时间直接在 DB 里格式化成 ISO 字符串（到秒、带时区偏移，与原先 isoformat() 输出一致），Python 层不再逐行处理
+    '''to_char(f.updated_at, 'YYYY-MM-DD"T"HH24:MI:SSTZH:TZM') AS updated_at''',
 ]
 
 _EXPORT_COLUMN_KEYS = [c.split(" AS ")[-1] if " AS " in c else c.split(".")[-1] for c in _EXPORT_COLUMNS_SQL]
@@ -70,30 +71,15 @@ _EXPORT_HEADER_LABELS = {
 
 _CSV_HEADERS = [_EXPORT_HEADER_LABELS.get(key, key) for key in _EXPORT_COLUMN_KEYS]
 
+# 服务端游标每批取回的行数
+_EXPORT_FETCH_ROWS = 1000
 
-# ============= 原生 SQL + 流式导出 ============= #
-def export_freight_csv_iter(
-    db: Session,
-    *,
-    sku_prefix: Optional[str],
-    tags_csv: Optional[str],
-    shipping_types_csv: Optional[str],
-    flush_bytes: int = 64 * 1024,
-):
-    if db is None:
-        raise ValueError("导出运费结果需要有效的数据库会话")
+# SELECT 列顺序就是 CSV 列顺序；只有 tags 列需要逐行转换，按位置处理即可
+_TAGS_IDX = _EXPORT_COLUMN_KEYS.index("product_tags")
 
-    return export_freight_csv_iter_sql(
-        db,
-        sku_prefix=sku_prefix,
-        tags_csv=tags_csv,
-        shipping_types_csv=shipping_types_csv,
-        flush_bytes=flush_bytes,
-    )
 
-
-def export_freight_csv_iter_sql(
-    db: Session,
+# ============= 原生 SQL + 流式导出 ============= #
+async def export_freight_csv_iter(
     *,
     sku_prefix: Optional[str],
     tags_csv: Optional[str],
@@ -101,8 +87,9 @@ def export_freight_csv_iter_sql(
     flush_bytes: int = 64 * 1024,
 ):
     """
-    生成器：从 DB 按条件读取，流式写 CSV（原生 SQL）。
-    用法（在路由里）：StreamingResponse(export_freight_csv_iter_sql(...), media_type='text/csv')
+    异步生成器：从 DB 按条件读取，流式写 CSV（原生 SQL）。
+    用法（在路由里）：StreamingResponse(export_freight_csv_iter(...), media_type='text/csv')
+    会话与游标的用法见 app/db/session.py 里流式响应的约定。
     """
     where_sql, params = _build_where_sql_for_export(sku_prefix, tags_csv, shipping_types_csv)
     sql = f"""
@@ -112,8 +99,6 @@ def export_freight_csv_iter_sql(
         WHERE {where_sql}
         ORDER BY f.sku_code
     """
-    conn = db.connection()
-    rs = conn.execution_options(stream_results=True).execute(text(sql), params)
 
     buf = io.StringIO()
     writer = csv.writer(buf)
@@ -123,17 +108,16 @@ def export_freight_csv_iter_sql(
     yield buf.getvalue()
     buf.seek(0); buf.truncate(0)
 
-    keys = rs.keys()
-    for row in rs:
-        d = dict(zip(keys, row))
-        d["product_tags"] = format_product_tags(d.get("product_tags"))
-        updated = d.get("updated_at")
-        if isinstance(updated, datetime):
-            d["updated_at"] = updated.replace(microsecond=0).isoformat()
-        writer.writerow([d.get(key) for key in _EXPORT_COLUMN_KEYS])
-        # 分块 flush，保证长流稳定
-        for chunk in _csv_write_flush(buf, flush_bytes):
-            yield chunk
+    async with AsyncSessionLocal() as db:
+        rs = await db.stream(
+            text(sql), params, execution_options={"yield_per": _EXPORT_FETCH_ROWS},
+        )
+        async for partition in rs.partitions():
+            writer.writerows(map(_export_row, partition))
+            # 攒够 flush_bytes 再吐一块：buf.tell() 是 O(1)，不用每批 getvalue() 复制整个缓冲区
+            if buf.tell() >= flush_bytes:
+                yield buf.getvalue()
+                buf.seek(0); buf.truncate(0)
 
     # 尾块
     leftover = buf.getvalue()
@@ -141,6 +125,13 @@ def export_freight_csv_iter_sql(
         yield leftover
 
 
+"""单行：DB 行 → CSV 列值（顺序与 _CSV_HEADERS 一致，不再逐行建 dict）"""
+def _export_row(row) -> list:
+    out = list(row)
+    out[_TAGS_IDX] = format_product_tags(out[_TAGS_IDX])
+    return out
+
+
 # 构建导出用的 where 子句（原生 SQL 版）
 def _build_where_sql_for_export(
     sku_prefix: Optional[str],
@@ -151,8 +142,9 @@ def _build_where_sql_for_export(
     conds, params = ["1=1"], {}
 
     if sku_prefix:
-        conds.append("f.sku_code ILIKE :sku")
-        params["sku"] = sku_prefix + "%"
+        # 与列表接口同一写法：走 ix_kogan_sku_freight_fee_lower_sku_code 前缀索引，不再 ILIKE 全表扫
+        conds.append("lower(f.sku_code) LIKE :sku ESCAPE '\\'")
+        params["sku"] = escape_like(sku_prefix.lower()) + "%"
 
     if shipping_types_csv:
         sts = [s.strip() for s in shipping_types_csv.split(",") if s.strip()]
@@ -178,14 +170,6 @@ def _build_where_sql_for_export(
 
 
 
-"""把缓冲区内容吐出去，然后清空。"""
-def _csv_write_flush(buf: io.StringIO, flush_bytes: int):
-    payload = buf.getvalue()
-    if payload and len(payload) >= flush_bytes:
-        yield payload
-        buf.seek(0); buf.truncate(0)
-
-
 def _parse_tags_filter(raw: Optional[str]) -> list[str]:
     if not raw:
         return []
@@ -1,16 +1,20 @@
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Sequence, Set
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 import csv
+import gzip
 import io
 import os
+import zlib
 from pathlib import Path
 
 
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.repository.product_repo import load_products_map
@@ -23,16 +27,28 @@ from app.repository.kogan_template_repo import (
     create_export_job as repo_create_export_job,
     fetch_latest_export_job,
     get_export_job,
+    get_export_job_file_meta,
     iter_changed_skus,
+    iter_export_job_file_chunks,
     load_kogan_baseline_map,
     mark_job_status,
     KoganTemplateModel,
 )
 from app.core.logging import configure_logging
+from app.db.session import AsyncSessionLocal
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
+# 下载导出文件时每次从 DB 读取的字节数
+EXPORT_FILE_CHUNK_BYTES = 64 * 1024
+# 导出文件生成一次、下载多次：入库前 gzip 一次，下载时直接以 Content-Encoding: gzip 发送
+EXPORT_FILE_ENCODING = "gzip"
+EXPORT_FILE_GZIP_LEVEL = 6
+
+# 导出文件名用墨尔本时间；ZoneInfo 只在导入时构建一次
+_MELBOURNE_TZ = ZoneInfo("Australia/Melbourne")
+
 # batch size 默认常量
 DEFAULT_BATCH_SIZE = 5000
 MIN_BATCH_SIZE = 1000
@@ -104,6 +120,15 @@ COUNTRY_COLUMN_SPECS: Dict[str, List[ColumnSpec]] = {
     ],
 }
 
+# 每个国家的 CSV 表头与行取值 key（按列顺序），导入时算好
+_COUNTRY_CSV_LAYOUT: Dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    country: (
+        tuple(col.header for col in specs),
+        tuple(col.logical_key for col in specs),
+    )
+    for country, specs in COUNTRY_COLUMN_SPECS.items()
+}
+
 HEADER_ONLY_COLUMNS = {"Stock", "Barcode"}
 _PERCENT_DIFF_COLUMNS = {"Price", "Kogan First Price"}
 _PERCENT_DIFF_THRESHOLD = Decimal("0.02")
@@ -172,7 +197,9 @@ def create_kogan_export_job(
         db,
         country_type=country_type,
         file_name=build.file_name,
-        file_bytes=build.file_bytes,
+        # mtime=0：同一份 CSV 压缩结果固定
+        file_bytes=gzip.compress(build.file_bytes, compresslevel=EXPORT_FILE_GZIP_LEVEL, mtime=0),
+        content_encoding=EXPORT_FILE_ENCODING,
         row_count=build.row_count,
         created_by=created_by,
         sku_records=[
@@ -196,14 +223,43 @@ def create_kogan_export_job(
 
 
 
-# 获取导出任务及其文件内容；找不到则抛错
-def get_export_job_file(db: Session, job_id: str) -> KoganExportJob:
-    job = get_export_job(db, job_id)
+# 获取导出任务的下载元数据（含 content_length，不含文件内容）；找不到则抛错
+async def get_export_job_file(db: AsyncSession, job_id: str) -> Row:
+    job = await get_export_job_file_meta(db, job_id)
     if job is None:
         raise ExportJobNotFoundError(f"未找到导出任务: {job_id}")
     return job
 
 
+"""
+流式读取导出文件内容（按库里存储的原样字节），供 StreamingResponse 使用。
+会话与游标的用法见 app/db/session.py 里流式响应的约定。
+    - gunzip=True：边读边解压，给不支持 gzip 的客户端
+"""
+async def iter_export_job_file(
+    job_id: str,
+    total_bytes: int,
+    chunk_size: int = EXPORT_FILE_CHUNK_BYTES,
+    *,
+    gunzip: bool = False,
+) -> AsyncIterator[bytes]:
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS) if gunzip else None
+    async with AsyncSessionLocal() as db:
+        async for chunk in iter_export_job_file_chunks(
+            db, job_id, total_bytes=total_bytes, chunk_size=chunk_size,
+        ):
+            if decompressor is None:
+                yield chunk
+                continue
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+    if decompressor is not None:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
 
 def apply_export_job(
     db: Session,
@@ -269,10 +325,9 @@ def _build_export_dataset(
     column_specs: Sequence[ColumnSpec],
 ) -> ExportJobBuild:
     
-    headers = [col.header for col in column_specs]
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(headers)
+    # 每行只按列顺序取值：列 key 预先算好，行先收集，最后一次 writerows（C 实现的 csv.writer 负责转义）
+    headers, row_keys = _COUNTRY_CSV_LAYOUT[country_type]
+    csv_rows: List[List[object]] = []
 
     sku_records: List[ExportJobSkuRecord] = []
     exported_skus: List[str] = []
@@ -376,8 +431,7 @@ def _build_export_dataset(
                 continue
 
             # 6 - write csv row
-            row = [sparse.get(col.logical_key, "") for col in column_specs]
-            writer.writerow(row)
+            csv_rows.append([sparse.get(key, "") for key in row_keys])
             row_count += 1
             exported_skus.append(sku)
             exported_set.add(sku)
@@ -391,8 +445,12 @@ def _build_export_dataset(
                 )
             )
 
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    writer.writerows(csv_rows)
     csv_bytes = buf.getvalue().encode("utf-8")
-    melbourne_now = datetime.now(ZoneInfo("Australia/Melbourne"))
+    melbourne_now = datetime.now(_MELBOURNE_TZ)
     filename = f'kogan_diff_{country_type}_{melbourne_now.strftime("%Y%m%dT%H%M%S")}.csv'
 
     skipped_dirty_skus = [sku for sku in dirty_order if sku not in exported_set]
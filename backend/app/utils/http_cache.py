@@ -0,0 +1,49 @@
+
+from __future__ import annotations
+import hashlib
+from typing import Optional
+
+
+def weak_etag(payload: bytes) -> str:
+    """按响应内容生成弱 ETag：W/"<sha1>" """
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match 是否命中（弱比较：忽略 W/ 前缀）。
+    支持逗号分隔的多个值和 "*"。
+    """
+    if not if_none_match:
+        return False
+    target = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == target:
+            return True
+    return False
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """
+    Accept-Encoding 是否接受某种压缩（如 "gzip"）。
+    显式 q=0 视为拒绝；"*" 通配。
+    """
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == coding:
+            return q > 0
+        if name == "*":
+            wildcard = q > 0
+    return wildcard
@@ -0,0 +1,112 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import freight_config as module
+from app.db.session import get_async_db
+from app.repository.freight_cal_config_repo import DEFAULTS
+
+
+def _client(monkeypatch, row, updates=None, reads=None):
+    async def _fake_get(db):
+        if reads is not None:
+            reads.append(1)
+        return row
+
+    async def _fake_update(db, payload):
+        if updates is not None:
+            updates.append(payload)
+        return row
+
+    async def _fake_db():
+        yield None
+
+    monkeypatch.setattr(module, "get_or_create_config_async", _fake_get)
+    monkeypatch.setattr(module, "update_config_async", _fake_update)
+    monkeypatch.setattr(module, "_config_cache", None)
+
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_async_db] = _fake_db
+    return TestClient(app)
+
+
+def _row():
+    # DB 里 Numeric 列读出来是 Decimal
+    return SimpleNamespace(**{k: Decimal(str(v)) for k, v in DEFAULTS.items()})
+
+
+def test_get_config_returns_every_field_as_number(monkeypatch):
+    resp = _client(monkeypatch, _row()).get("/freight-config")
+
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "private, max-age=5"
+    assert resp.json() == {k: float(v) for k, v in DEFAULTS.items()}
+
+
+def test_patch_config_validates_body_and_sends_only_given_fields(monkeypatch):
+    updates = []
+    client = _client(monkeypatch, _row(), updates)
+
+    assert client.patch("/freight-config", json={"adjust_rate": "oops"}).status_code == 422
+
+    resp = client.patch("/freight-config", json={"adjust_rate": 0.05})
+    assert resp.status_code == 200
+    assert updates == [{"adjust_rate": 0.05}]
+
+
+def test_openapi_keeps_freight_config_schema():
+    app = FastAPI()
+    app.include_router(module.router)
+    schema = app.openapi()["paths"]["/freight-config"]["get"]["responses"]["200"]
+
+    assert schema["content"]["application/json"]["schema"]["$ref"].endswith("/FreightConfig")
+
+
+def test_model_fields_match_repo_whitelist():
+    assert set(module.FreightConfig.model_fields) == set(module.ALL_FIELDS)
+
+
+def test_put_config_requires_every_field(monkeypatch):
+    updates = []
+    client = _client(monkeypatch, _row(), updates)
+    full = {k: float(v) for k, v in DEFAULTS.items()}
+
+    resp = client.put("/freight-config", json={**full, "adjust_rate": None, "wa_r": None})
+    assert resp.status_code == 422
+    assert [err["loc"] for err in resp.json()["detail"]] == [["body", "adjust_rate"], ["body", "wa_r"]]
+    assert updates == []
+
+    assert client.put("/freight-config", json=full).status_code == 200
+    assert updates == [full]
+
+
+def test_get_config_is_served_from_cache_until_a_write(monkeypatch):
+    reads = []
+    row = _row()
+    client = _client(monkeypatch, row, reads=reads)
+
+    assert client.get("/freight-config").json()["adjust_rate"] == 0.04
+    assert client.get("/freight-config").json()["adjust_rate"] == 0.04
+    assert len(reads) == 1
+
+    row.adjust_rate = Decimal("0.05")
+    resp = client.patch("/freight-config", json={"adjust_rate": 0.05})
+    assert resp.headers["cache-control"] == "no-store"
+
+    assert client.get("/freight-config").json()["adjust_rate"] == 0.05
+    assert len(reads) == 1
+
+
+def test_patch_config_ignores_unset_and_null_fields(monkeypatch):
+    updates = []
+    reads = []
+    client = _client(monkeypatch, _row(), updates, reads)
+
+    assert client.patch("/freight-config", json={"adjust_rate": 0.05, "wa_r": None}).status_code == 200
+    assert client.patch("/freight-config", json={"wa_r": None}).status_code == 200
+
+    assert updates == [{"adjust_rate": 0.05}]
+    assert len(reads) == 1
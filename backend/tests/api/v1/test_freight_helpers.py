@@ -0,0 +1,65 @@
+from datetime import datetime
+from decimal import Decimal
+
+from app.api.v1.freight import _build_freight_row, _format_datetime, _parse_csv_list
+
+
+def _row(**overrides):
+    # 与 fetch_freight_results_page 的 SELECT 列顺序一致
+    columns = [
+        "sku_code", "shipping_type", "adjust", "same_shipping", "shipping_ave",
+        "shipping_ave_m", "shipping_ave_r", "shipping_med", "shipping_med_dif", "remote_check",
+        "rural_ave", "weighted_ave_s", "cubic_weight", "weight", "price_ratio",
+        "selling_price", "shopify_price", "kogan_au_price", "kogan_k1_price", "kogan_nz_price",
+        "updated_at", "product_tags", "cost", "total_count",
+    ]
+    values = dict.fromkeys(columns)
+    values.update(overrides)
+    return tuple(values[c] for c in columns)
+
+
+def test_build_freight_row_unpacks_positionally():
+    item = _build_freight_row(_row(
+        sku_code="V201-A",
+        shipping_type="Extra2",
+        adjust=Decimal("1.20"),
+        cubic_weight=Decimal("3.500"),
+        kogan_nz_price=Decimal("42.50"),
+        remote_check=True,
+        updated_at=datetime(2025, 1, 2, 3, 4, 5, 678),
+        product_tags=["tagA", "tagB"],
+        total_count=10,
+    )).model_dump()
+
+    assert item["id"] == item["sku_code"] == "V201-A"
+    assert item["shipping_type"] == "Extra2"
+    assert item["adjust"] == 1.2
+    assert item["cubic_weight"] == 3.5
+    assert item["kogan_nz_price"] == 42.5
+    assert item["remote_check"] is True
+    assert item["updated_at"] == "2025-01-02T03:04:05"
+    assert item["tag"] == "tagA" and item["tags"] == ["tagA", "tagB"]
+
+
+def test_build_freight_row_handles_nulls():
+    item = _build_freight_row(_row(sku_code="X")).model_dump()
+
+    assert item["shipping_type"] == ""
+    assert item["weight"] is None
+    assert item["tag"] is None and item["tags"] == []
+    assert item["updated_at"] is None
+
+
+def test_parse_csv_list_strips_dedupes_and_keeps_order():
+    assert _parse_csv_list(" 10, Extra2 ,,10, 1 ") == ("10", "Extra2", "1")
+    assert _parse_csv_list(None) == ()
+    assert _parse_csv_list(" , ") == ()
+
+
+def test_format_datetime_reuses_formatted_string_for_same_value():
+    first = _format_datetime(datetime(2025, 3, 4, 5, 6, 7, 890))
+    second = _format_datetime(datetime(2025, 3, 4, 5, 6, 7, 890))
+
+    assert first == "2025-03-04T05:06:07"
+    assert first is second
+    assert _format_datetime("2025-03-04") is None
@@ -0,0 +1,134 @@
+import gzip
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import kogan_template_download as module
+from app.db.session import get_async_db
+from app.services.auth_service import get_current_user
+
+
+_JOB = SimpleNamespace(
+    id="job-1",
+    file_name="kogan_au.csv",
+    row_count=3,
+    status="exported",
+    country_type="AU",
+    applied_at=None,
+    exported_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    content_encoding=None,
+    content_length=6,
+)
+
+_CSV = b"a,b\n1\n"
+_GZ_JOB = SimpleNamespace(**{**vars(_JOB), "id": "job-gz", "content_encoding": "gzip", "content_length": len(gzip.compress(_CSV))})
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    streamed = []
+    jobs = {"job-1": _JOB, "job-gz": _GZ_JOB}
+
+    async def _fake_get_export_job_file(db, job_id):
+        return jobs[job_id]
+
+    async def _fake_iter_export_job_file(job_id, total_bytes, *, gunzip=False):
+        streamed.append((job_id, gunzip))
+        if jobs[job_id].content_encoding == "gzip" and not gunzip:
+            yield gzip.compress(_CSV)
+        else:
+            yield _CSV
+
+    async def _fake_db():
+        yield None
+
+    monkeypatch.setattr(module, "get_export_job_file", _fake_get_export_job_file)
+    monkeypatch.setattr(module, "iter_export_job_file", _fake_iter_export_job_file)
+
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_async_db] = _fake_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    test_client = TestClient(app)
+    test_client.streamed = streamed
+    test_client.jobs = jobs
+    return test_client
+
+
+def test_export_job_download_sends_etag_and_revalidates(client):
+    resp = client.get("/kogan-template/export/job-1/download")
+
+    assert resp.status_code == 200
+    assert resp.content == b"a,b\n1\n"
+    assert resp.headers["etag"] == '"job-1-3-exported-0"'
+    assert resp.headers["cache-control"] == "private, no-cache"
+    assert resp.headers["x-kogan-export-exported-at"] == "2025-01-02 14:04:05"    # AEDT, UTC+11
+    assert resp.headers["x-kogan-export-applied-at"] == ""
+    assert "ETag" in resp.headers["access-control-expose-headers"]
+    assert client.streamed == [("job-1", False)]
+
+
+def test_export_job_download_returns_304_without_reading_file(client):
+    resp = client.get(
+        "/kogan-template/export/job-1/download",
+        headers={"If-None-Match": '"job-1-3-exported-0"'},
+    )
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == '"job-1-3-exported-0"'
+    assert client.streamed == []
+
+
+def test_applying_the_job_invalidates_the_cached_download(client):
+    etag = client.get("/kogan-template/export/job-1/download").headers["etag"]
+    applied = SimpleNamespace(**{**vars(_JOB), "status": "applied", "applied_at": datetime(2025, 1, 3, tzinfo=timezone.utc)})
+    client.jobs["job-1"] = applied
+
+    resp = client.get("/kogan-template/export/job-1/download", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.headers["x-kogan-export-status"] == "applied"
+    assert resp.headers["x-kogan-export-applied-at"] == "2025-01-03 11:00:00"
+
+
+def test_diff_download_stays_no_store(client):
+    resp = client.get("/kogan-template/download", params={"job_id": "job-1"})
+
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "no-store"
+    assert "etag" not in resp.headers
+
+
+def test_gzipped_job_is_sent_as_is_to_gzip_clients(client):
+    resp = client.get("/kogan-template/export/job-gz/download", headers={"Accept-Encoding": "gzip"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["content-length"] == str(_GZ_JOB.content_length)
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert resp.headers["etag"] == '"job-gz-3-exported-0-gzip"'
+    assert resp.content == _CSV      # httpx 自动解压
+    assert client.streamed == [("job-gz", False)]
+
+
+def test_gzipped_job_is_decompressed_for_identity_clients(client):
+    resp = client.get("/kogan-template/export/job-gz/download", headers={"Accept-Encoding": "identity"})
+
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+    assert "content-length" not in resp.headers
+    assert resp.headers["etag"] == '"job-gz-3-exported-0"'
+    assert resp.content == _CSV
+    assert client.streamed == [("job-gz", True)]
+
+
+def test_create_export_rejects_unknown_country(client):
+    resp = client.post("/kogan-template/export", params={"country_type": "US"})
+
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["query", "country_type"]
@@ -0,0 +1,124 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import product as module
+from app.db.session import get_db
+
+
+def _client(monkeypatch, rows, calls=None):
+    def _fake_page(db, **kwargs):
+        if calls is not None:
+            calls.append(kwargs)
+        # 与 fetch_products_page 一样每次返回新 dict；带 cursor 时不再计算 total
+        return [dict(r) for r in rows], None if kwargs.get("cursor") else len(rows)
+
+    def _fake_db():
+        yield None
+
+    monkeypatch.setattr(module, "fetch_products_page", _fake_page)
+
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_db] = _fake_db
+    return TestClient(app)
+
+
+def test_list_products_normalizes_row_types(monkeypatch):
+    row = {
+        "id": 7,
+        "sku_code": "V201-1",
+        "price": Decimal("12.50"),
+        "freight_nz": None,
+        "special_price_end_date": date(2025, 1, 2),
+        "updated_at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "product_tags": ["a", "b"],
+    }
+    resp = _client(monkeypatch, [row]).get("/products")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 1
+    item = body["items"][0]
+    assert item["id"] == "7"
+    assert item["price"] == 12.5
+    assert item["freight_nz"] is None
+    assert item["special_price_end_date"] == "2025-01-02T00:00:00"
+    assert item["updated_at"] == "2025-01-02T03:04:05+00:00"
+    assert item["tags"] == ["a", "b"]
+    assert "product_tags" not in item
+    assert item["supplier"] is None
+
+
+def test_openapi_keeps_products_page_schema(monkeypatch):
+    schema = _client(monkeypatch, []).get("/openapi.json").json()
+    ref = schema["paths"]["/products"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert ref["$ref"].endswith("/ProductsPage")
+
+
+def test_list_products_emits_next_cursor_and_accepts_it(monkeypatch):
+    ts = datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+    rows = [
+        {"id": 1, "sku_code": "A", "updated_at": ts},
+        {"id": 2, "sku_code": "B", "updated_at": ts},
+        {"id": 3, "sku_code": "C", "updated_at": None},   # 多取的一条，只用于判断 has_more
+    ]
+    calls = []
+    client = _client(monkeypatch, rows, calls)
+
+    body = client.get("/products", params={"page_size": 2}).json()
+    assert [i["sku_code"] for i in body["items"]] == ["A", "B"]
+    assert body["total"] == 3
+    assert body["next_cursor"]
+
+    body = client.get("/products", params={"page_size": 2, "cursor": body["next_cursor"]}).json()
+    assert calls[-1]["cursor"] == (ts, "B")
+    assert body["total"] is None
+
+
+def test_list_products_last_page_has_no_cursor_and_deep_offset_is_deprecated(monkeypatch):
+    client = _client(monkeypatch, [{"id": 1, "sku_code": "A"}])
+
+    resp = client.get("/products", params={"page": 2})
+    assert resp.json()["next_cursor"] is None
+    assert resp.headers["deprecation"] == "true"
+    assert "deprecation" not in client.get("/products").headers
+
+
+def test_list_products_rejects_malformed_cursor(monkeypatch):
+    client = _client(monkeypatch, [])
+    assert client.get("/products", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_normalize_tags_filter_single_and_multi():
+    assert module._normalize_tags_filter(None) is None
+    assert module._normalize_tags_filter("  ") is None
+    assert module._normalize_tags_filter(" a ") == ("a",)
+    assert module._normalize_tags_filter("a, ,b") == ("a", "b")
+    assert module._normalize_tags_filter(" , ") is None
+
+
+def test_list_products_returns_304_when_page_unchanged(monkeypatch):
+    client = _client(monkeypatch, [{"id": 1, "sku_code": "A"}])
+
+    first = client.get("/products")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/products", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def test_list_product_tags_etag_and_304(monkeypatch):
+    monkeypatch.setattr(module, "get_product_tags_body", lambda loader: (b'["a"]', 'W/"t1"'))
+    client = _client(monkeypatch, [])
+
+    resp = client.get("/products/tags")
+    assert resp.json() == ["a"]
+    assert resp.headers["etag"] == 'W/"t1"'
+    assert resp.headers["cache-control"].startswith("private, max-age=")
+
+    assert client.get("/products/tags", headers={"If-None-Match": 'W/"t1"'}).status_code == 304
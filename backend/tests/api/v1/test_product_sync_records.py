@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import product_sync_records as module
+from app.api.v1.product_sync_records import ProductSyncChunkOut
+from app.db.session import get_db
+
+
+def test_chunks_page_embeds_json_text_sku_lists(monkeypatch):
+    run_id = uuid.uuid4()
+    values = {
+        "run_id": run_id,
+        "chunk_idx": 0,
+        "status": "succeeded",
+        "sku_count": 2,
+        "dsz_missing": 1,
+        "dsz_failed_skus": 0,
+        "dsz_requested_total": 2,
+        "dsz_returned_total": 1,
+        # DB 按 JSON 文本返回
+        "dsz_missing_sku_list": '["A"]',
+        "dsz_failed_sku_list": "[]",
+        "dsz_extra_sku_list": "[]",
+        "started_at": datetime(2025, 1, 2, tzinfo=timezone.utc),
+        "finished_at": None,
+        "last_error": None,
+        "total_count": 1,
+    }
+
+    class _Row:
+        def _asdict(self):
+            return dict(values)
+
+    monkeypatch.setattr(module, "fetch_product_sync_chunks_page", lambda db, **kw: ([_Row()], 1))
+
+    def _fake_db():
+        yield None
+
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_db] = _fake_db
+
+    body = TestClient(app).get("/product-sync-records/chunks").json()
+
+    item = body["items"][0]
+    assert set(item) == set(ProductSyncChunkOut.model_fields)
+    assert item["dsz_missing_sku_list"] == ["A"]
+    assert item["run_id"] == str(run_id)
+    ProductSyncChunkOut.model_validate(item)
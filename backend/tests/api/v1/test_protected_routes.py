@@ -0,0 +1,76 @@
+from fastapi.routing import APIRoute
+
+from app.api.v1 import protected
+from app.services.auth_service import get_current_user
+
+
+def _router_level_auth_count(route: APIRoute) -> int:
+    # 路由级依赖没有参数名；带参数名的是端点自己要用的 current_user
+    return sum(
+        1
+        for dep in route.dependant.dependencies
+        if dep.call is get_current_user and dep.name is None
+    )
+
+
+def test_protected_routes_declare_auth_once():
+    routes = [r for r in protected.routes if isinstance(r, APIRoute)]
+    assert routes
+
+    duplicated = {r.path: _router_level_auth_count(r) for r in routes if _router_level_auth_count(r) != 1}
+    assert duplicated == {}
+
+
+def test_v1_routes_are_registered_once():
+    from app.api.v1 import api_v1
+
+    seen = {}
+    for route in api_v1.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in route.methods:
+            key = (method, route.path)
+            seen[key] = seen.get(key, 0) + 1
+
+    assert {key: n for key, n in seen.items() if n > 1} == {}
+
+
+def test_endpoint_level_current_user_reuses_router_auth_result(monkeypatch):
+    from types import SimpleNamespace
+
+    from fastapi import APIRouter, Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1 import kogan_template_download as module
+    from app.db.session import get_db
+
+    calls = []
+
+    def _fake_user():
+        calls.append(1)
+        return SimpleNamespace(id=7)
+
+    def _fake_db():
+        yield None
+
+    captured = {}
+
+    def _fake_create(db, country_type, created_by):
+        captured["created_by"] = created_by
+        return SimpleNamespace()
+
+    monkeypatch.setattr(module, "create_kogan_export_job", _fake_create)
+    monkeypatch.setattr(module, "serialize_export_job", lambda job: {"ok": True})
+
+    wrapper = APIRouter(dependencies=[Depends(get_current_user)])
+    wrapper.include_router(module.router)
+    app = FastAPI()
+    app.include_router(wrapper)
+    app.dependency_overrides[get_current_user] = _fake_user
+    app.dependency_overrides[get_db] = _fake_db
+
+    resp = TestClient(app).post("/kogan-template/export", params={"country_type": "AU"})
+
+    assert resp.status_code == 200
+    assert captured == {"created_by": 7}
+    assert len(calls) == 1
@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import routes_health as module
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(module.router)
+    return TestClient(app)
+
+
+def test_health_reports_db_latency(monkeypatch):
+    async def _ok():
+        return None
+
+    monkeypatch.setattr(module, "_ping_db", _ok)
+
+    resp = _client().get("/health")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "ok"
+    assert isinstance(body["db"], float)
+
+
+def test_health_returns_503_when_db_ping_times_out(monkeypatch):
+    async def _slow():
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(module, "_ping_db", _slow)
+    monkeypatch.setattr(module, "_DB_PING_TIMEOUT_SEC", 0.01)
+
+    resp = _client().get("/health")
+
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "unavailable"
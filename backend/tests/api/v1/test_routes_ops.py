@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import routes_ops as module
+from app.db.session import get_db
+
+
+class _FakeDb:
+    def __init__(self, run):
+        self._run = run
+
+    def execute(self, stmt):
+        return self
+
+    def one_or_none(self):
+        return self._run
+
+
+def _client(run=None):
+    def _fake_db():
+        yield _FakeDb(run)
+
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_db] = _fake_db
+    return TestClient(app)
+
+
+def test_reset_price_enqueues_kick_price_reset(monkeypatch):
+    # 替换模块上的名字而不是 patch 任务 proxy：proxy 按线程解析 current_app，路由跑在线程池里可能解析到另一个任务实例
+    monkeypatch.setattr(module, "kick_price_reset", SimpleNamespace(delay=lambda: SimpleNamespace(id="task-1")))
+
+    resp = _client().post("/ops/reset-price")
+
+    assert resp.status_code == 200
+    assert resp.json() == {"task_id": "task-1"}
+
+
+def test_resume_run_404_and_400_without_scheduling():
+    assert _client(None).post("/ops/sync/runs/r1/resume").status_code == 404
+
+    no_bulk = SimpleNamespace(shopify_bulk_id=None, shopify_bulk_url=None)
+    assert _client(no_bulk).post("/ops/sync/runs/r1/resume").status_code == 400
@@ -0,0 +1,37 @@
+from typing import get_args
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import scheduler as module
+from app.db.session import get_db
+
+
+def _client(monkeypatch, calls):
+    def _fake_upsert(db, key, dto):
+        calls.append(key)
+        raise AssertionError("upsert must not run for unknown keys")
+
+    def _fake_db():
+        yield None
+
+    monkeypatch.setattr(module, "upsert", _fake_upsert)
+    app = FastAPI()
+    app.include_router(module.router)
+    app.dependency_overrides[get_db] = _fake_db
+    return TestClient(app)
+
+
+def test_unknown_schedule_key_is_rejected_by_path_validation(monkeypatch):
+    calls = []
+    body = {"enabled": True, "day_of_week": "WED", "hour": 20, "minute": 0}
+
+    resp = _client(monkeypatch, calls).put("/schedules/nope", json=body)
+
+    assert resp.status_code == 422
+    assert calls == []
+
+
+def test_every_schedule_key_has_defaults():
+    # 去掉了运行时的 key 检查：ScheduleKey 与默认值表必须保持一致
+    assert set(get_args(module.ScheduleKey)) == set(module._DEFAULTS_DTO)
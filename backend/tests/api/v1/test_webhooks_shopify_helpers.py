@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import hmac
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import webhooks_shopify as module
+
+
+class _FakeSession:
+    def __init__(self, value, log):
+        self._value = value
+        self._log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._log.append("closed")
+
+    def execute(self, stmt):
+        self._log.append(stmt)
+        return self
+
+    def scalar(self):
+        return self._value
+
+
+def test_run_id_by_bulk_selects_single_column_and_closes_session(monkeypatch):
+    module._cached_run_id.cache_clear()
+    log = []
+    monkeypatch.setattr(module, "SessionLocal", lambda: _FakeSession("run-1", log))
+
+    assert module._run_id_by_bulk("gid://shopify/BulkOperation/1") == "run-1"
+
+    stmt, closed = log
+    assert [c.name for c in stmt.selected_columns] == ["id"]
+    assert closed == "closed"
+
+
+def _sign(secret: bytes, body: bytes) -> str:
+    return base64.b64encode(hmac.new(secret, body, hashlib.sha256).digest()).decode()
+
+
+def test_verify_hmac_accepts_valid_signature(monkeypatch):
+    monkeypatch.setattr(module, "_WEBHOOK_SECRET_BYTES", b"shh")
+    body = b'{"admin_graphql_api_id": "gid://shopify/BulkOperation/1"}'
+
+    module._verify_hmac_or_401(_sign(b"shh", body), body)
+
+
+@pytest.mark.parametrize("provided", ["short", "é" * 44, _sign(b"other", b"{}")])
+def test_verify_hmac_rejects_bad_signatures_with_401(monkeypatch, provided):
+    monkeypatch.setattr(module, "_WEBHOOK_SECRET_BYTES", b"shh")
+    computed = []
+    real = module._compute_hmac_base64
+    monkeypatch.setattr(module, "_compute_hmac_base64", lambda body: computed.append(1) or real(body))
+
+    with pytest.raises(HTTPException) as exc:
+        module._verify_hmac_or_401(provided, b"{}")
+
+    assert exc.value.status_code == 401
+    if provided == "short":
+        # 长度不对时不做哈希
+        assert computed == []
+
+
+def test_run_id_by_bulk_caches_hits_but_not_misses(monkeypatch):
+    module._cached_run_id.cache_clear()
+    log = []
+    values = iter([None, "run-2"])
+    monkeypatch.setattr(module, "SessionLocal", lambda: _FakeSession(next(values), log))
+
+    assert module._run_id_by_bulk("gid://shopify/BulkOperation/2") is None
+    assert module._run_id_by_bulk("gid://shopify/BulkOperation/2") == "run-2"
+    assert module._run_id_by_bulk("gid://shopify/BulkOperation/2") == "run-2"
+    assert log.count("closed") == 2
+
+
+class _FakeWriteSession(_FakeSession):
+    def commit(self):
+        self._log.append("commit")
+
+    def rollback(self):
+        self._log.append("rollback")
+
+
+def test_stamp_webhook_received_is_a_single_conditional_update(monkeypatch):
+    log = []
+    monkeypatch.setattr(module, "SessionLocal", lambda: _FakeWriteSession(None, log))
+
+    module._stamp_webhook_received("gid://shopify/BulkOperation/1", module.datetime.now(module._CELERY_TZ))
+
+    stmt, committed, closed = log
+    sql = str(stmt)
+    assert sql.startswith("UPDATE product_sync_run")
+    assert "webhook_received_at IS NULL" in sql
+    assert (committed, closed) == ("commit", "closed")
+
+
+def _finish_client(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(module, "_WEBHOOK_SECRET_BYTES", b"shh")
+    app = FastAPI()
+    app.include_router(module.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("body", [b"{not json", b'["a"]'])
+def test_bulk_finish_rejects_bodies_that_are_not_a_json_object(monkeypatch, body):
+    resp = _finish_client(monkeypatch).post(
+        "/webhooks/shopify/bulk_operations/finish",
+        content=body,
+        headers={"X-Shopify-Hmac-Sha256": _sign(b"shh", body), "X-Shopify-Topic": "bulk_operations/finish"},
+    )
+
+    assert resp.status_code == 400
+    assert resp.json() == {"detail": "Invalid JSON payload"}
+
+
+def test_bulk_finish_ignores_other_topics(monkeypatch):
+    body = b"{}"
+    resp = _finish_client(monkeypatch).post(
+        "/webhooks/shopify/bulk_operations/finish",
+        content=body,
+        headers={"X-Shopify-Hmac-Sha256": _sign(b"shh", body), "X-Shopify-Topic": "products/update"},
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == {"ok": True, "ignored": "topic=products/update"}
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("12345", 12345), (7, 7), (None, None), ("n/a", None)],
+)
+def test_bulk_operation_node_coerces_root_object_count(raw, expected):
+    node = module.BulkOperationNode.model_validate(
+        {"id": "gid://shopify/BulkOperation/1", "status": "COMPLETED", "url": "https://x/y.jsonl", "rootObjectCount": raw}
+    )
+
+    assert node.rootObjectCount == expected
+    assert (node.status, node.url) == ("COMPLETED", "https://x/y.jsonl")
+
+
+def test_bulk_operation_node_defaults_when_fields_missing():
+    node = module.BulkOperationNode.model_validate({})
+
+    assert (node.status, node.url, node.rootObjectCount) == (None, None, None)
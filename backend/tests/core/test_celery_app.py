@@ -0,0 +1,17 @@
+from app.core.celery_app import celery_app
+
+
+def test_late_ack_tasks_are_requeued_when_the_worker_dies():
+    conf = celery_app.conf
+
+    assert conf.task_acks_late is True
+    assert conf.task_reject_on_worker_lost is True
+
+
+def test_task_events_and_rate_limit_bookkeeping_are_off():
+    conf = celery_app.conf
+
+    # 关闭后任务上的 rate_limit 会静默失效：新增任务若要限流，需同时改 celery_app 配置
+    assert conf.worker_disable_rate_limits is True
+    assert conf.worker_send_task_events is False
+    assert conf.task_send_sent_event is False
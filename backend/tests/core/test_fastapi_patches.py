@@ -0,0 +1,38 @@
+from fastapi.dependencies import utils as dep_utils
+
+from app.core.fastapi_patches import install_dependency_introspection_cache
+
+
+def test_introspection_cache_is_idempotent_and_correct():
+    install_dependency_introspection_cache()
+    patched = dep_utils.is_coroutine_callable
+    install_dependency_introspection_cache()
+    assert dep_utils.is_coroutine_callable is patched
+
+    async def async_dep():
+        return 1
+
+    def gen_dep():
+        yield 1
+
+    async def async_gen_dep():
+        yield 1
+
+    for _ in range(2):  # 第二轮命中缓存，结果不变
+        assert dep_utils.is_coroutine_callable(async_dep) is True
+        assert dep_utils.is_coroutine_callable(gen_dep) is False
+        assert dep_utils.is_gen_callable(gen_dep) is True
+        assert dep_utils.is_async_gen_callable(async_gen_dep) is True
+        assert dep_utils.is_async_gen_callable(gen_dep) is False
+
+
+def test_introspection_cache_handles_non_weakrefable_callables():
+    install_dependency_introspection_cache()
+
+    class Dep:
+        __slots__ = ()
+
+        async def __call__(self):
+            return 1
+
+    assert dep_utils.is_coroutine_callable(Dep()) is True
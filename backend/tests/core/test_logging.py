@@ -0,0 +1,40 @@
+import io
+import logging
+import sys
+
+import orjson
+
+from app.core.logging import JsonLineHandler
+
+
+class _Stdout:
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+
+def _emit(monkeypatch, record):
+    out = _Stdout()
+    monkeypatch.setattr("sys.stdout", out)
+    JsonLineHandler().handle(record)
+    return out.buffer.getvalue()
+
+
+def test_json_line_handler_writes_one_json_object_per_record(monkeypatch):
+    record = logging.LogRecord("yarra.test", logging.INFO, __file__, 1, "run=%s done", ("r1",), None)
+
+    line = _emit(monkeypatch, record)
+
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert orjson.loads(line) == {"ts": record.created, "lvl": "INFO", "name": "yarra.test", "msg": "run=r1 done"}
+
+
+def test_json_line_handler_includes_traceback(monkeypatch):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("yarra.test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+    entry = orjson.loads(_emit(monkeypatch, record))
+
+    assert entry["msg"] == "failed"
+    assert entry["exc"].endswith("ValueError: boom")
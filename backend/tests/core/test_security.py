@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+
+
+def test_verify_password_async_runs_on_dedicated_executor(monkeypatch):
+    hashed = security.get_password_hash("s3cret")
+    seen_threads = []
+
+    real_verify = security.verify_password
+
+    def _spy(plain, hashed_password):
+        seen_threads.append(threading.current_thread().name)
+        return real_verify(plain, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password", _spy)
+
+    async def _run():
+        return await asyncio.gather(
+            security.verify_password_async("s3cret", hashed),
+            security.verify_password_async("wrong", hashed),
+        )
+
+    assert asyncio.run(_run()) == [True, False]
+    assert all(name.startswith("password-hash") for name in seen_threads)
+
+
+def test_verify_password_accepts_existing_passlib_hashes_and_rejects_garbage():
+    # passlib 1.7.4 生成的 $2b$ 哈希（"s3cret"）
+    legacy = "$2b$12$rAcXCWJJF5b7cN0ZORAtkeq9y0q1BSVeLEyhWdKgjjI5BuJI.uJK."
+    assert security.verify_password("s3cret", legacy)
+    assert not security.verify_password("s3cret", "not-a-bcrypt-hash")
+
+
+def test_passwords_longer_than_72_bytes_are_truncated_like_before():
+    hashed = security.get_password_hash("x" * 80)
+    assert security.verify_password("x" * 72, hashed)
+
+
+@pytest.fixture
+def jwt_secret(monkeypatch):
+    # HS256 建议密钥至少 32 字节，否则 PyJWT 会告警
+    monkeypatch.setattr(security.settings, "SECRET_KEY", "k" * 32)
+
+
+def test_access_token_round_trip_and_rejects_tampering(jwt_secret):
+    token = security.create_access_token({"user_id": 7, "username": "ops"})
+
+    payload = security.decode_token(token)
+    assert payload["user_id"] == 7 and payload["username"] == "ops"
+
+    assert security.decode_token(token[:-2] + ("AA" if token[-2:] != "AA" else "BB")) is None
+    assert security.decode_token("not-a-jwt") is None
+
+
+def test_cached_token_still_expires(jwt_secret, monkeypatch):
+    token = security.create_access_token({"user_id": 7}, expires_minutes=1)
+    assert security.decode_token(token) is not None
+
+    # 缓存命中后时间越过 exp：不再放行
+    monkeypatch.setattr(security.time, "time", lambda: 4_102_444_800.0)
+    assert security.decode_token(token) is None
+
+
+def test_decode_token_returns_a_copy_of_the_cached_payload(jwt_secret):
+    token = security.create_access_token({"user_id": 7})
+
+    security.decode_token(token)["user_id"] = 999
+
+    assert security.decode_token(token)["user_id"] == 7
+
+
+def test_signed_token_without_exp_is_rejected(jwt_secret):
+    token = security.jwt.encode({"user_id": 7}, security.settings.SECRET_KEY, algorithm=security.ALGORITHM)
+
+    assert security.decode_token(token) is None
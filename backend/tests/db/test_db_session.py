@@ -0,0 +1,29 @@
+from app.db import session as module
+
+
+def test_connect_args_sets_statement_timeout_only_when_configured(monkeypatch):
+    monkeypatch.setattr(module.settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert module._connect_args() == {}
+
+    monkeypatch.setattr(module.settings, "DB_STATEMENT_TIMEOUT_MS", 15000)
+    assert module._connect_args() == {"options": "-c statement_timeout=15000"}
+
+
+def test_sync_and_async_pools_reuse_most_recent_connection_first():
+    assert module.engine.pool._pool.use_lifo
+    assert module.async_engine.sync_engine.pool._pool.use_lifo
+
+
+def test_pool_budget_is_split_across_workers(monkeypatch):
+    monkeypatch.setattr(module.settings, "WEB_CONCURRENCY", 4)
+    assert module._per_worker(20, 1) == 5
+    assert module._per_worker(2, 1) == 1
+    assert module._per_worker(2) == 0
+
+    monkeypatch.setattr(module.settings, "WEB_CONCURRENCY", 1)
+    assert module._per_worker(20, 1) == 20
+
+
+def test_async_pool_uses_its_own_smaller_budget():
+    assert module.async_engine.sync_engine.pool.size() == module._per_worker(module.settings.DB_ASYNC_POOL_SIZE, 1)
+    assert module.settings.DB_ASYNC_POOL_SIZE < module.settings.DB_POOL_SIZE
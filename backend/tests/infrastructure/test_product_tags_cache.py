@@ -0,0 +1,58 @@
+from app.infrastructure.cache import product_tags as module
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, b"0")) + 1).encode()
+
+
+def _setup(monkeypatch, client):
+    monkeypatch.setattr(module, "_local_cache", None)
+    monkeypatch.setattr(module, "_redis", lambda: client)
+
+
+def test_local_cache_skips_loader_within_ttl(monkeypatch):
+    _setup(monkeypatch, None)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return ["a", "b"]
+
+    assert module.get_product_tags_body(loader)[0] == b'["a","b"]'
+    assert module.get_product_tags_body(loader)[0] == b'["a","b"]'
+    assert calls == [1]
+
+
+def test_redis_layer_is_shared_and_version_bump_invalidates(monkeypatch):
+    fake = _FakeRedis()
+    _setup(monkeypatch, fake)
+
+    assert module.get_product_tags_body(lambda: ["a"])[0] == b'["a"]'
+    assert fake.store["product:tags:v0"] == b'["a"]'
+
+    # 另一个进程：本地缓存为空，直接读 Redis，不查库
+    monkeypatch.setattr(module, "_local_cache", None)
+    assert module.get_product_tags_body(lambda: ["never"])[0] == b'["a"]'
+
+    module.bump_product_tags_version()
+    assert module.get_product_tags_body(lambda: ["a", "c"])[0] == b'["a","c"]'
+    assert fake.store["product:tags:v1"] == b'["a","c"]'
+
+
+def test_redis_errors_fall_back_to_loader(monkeypatch):
+    class _Broken:
+        def get(self, key):
+            raise ConnectionError("down")
+
+    _setup(monkeypatch, _Broken())
+    assert module.get_product_tags_body(lambda: ["x"])[0] == b'["x"]'
@@ -0,0 +1,44 @@
+from app.infrastructure.cache import schedules as module
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+def test_cached_body_is_served_until_invalidated(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(module, "_redis", lambda: fake)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [{"key": "price_reset", "hour": 20}]
+
+    assert module.get_schedules_body(loader) == b'[{"key":"price_reset","hour":20}]'
+    assert module.get_schedules_body(loader) == b'[{"key":"price_reset","hour":20}]'
+    assert calls == [1]
+
+    module.invalidate_schedules()
+    module.get_schedules_body(loader)
+    assert calls == [1, 1]
+
+
+def test_without_redis_every_call_reads_db(monkeypatch):
+    monkeypatch.setattr(module, "_redis", lambda: None)
+    calls = []
+
+    module.get_schedules_body(lambda: calls.append(1) or [])
+    module.get_schedules_body(lambda: calls.append(1) or [])
+    module.invalidate_schedules()
+
+    assert calls == [1, 1]
@@ -88,3 +88,31 @@
 #         #     SkuFreightFee.sku_code.in_(sku_codes)
 #         # ).delete(synchronize_session=False)
 #         # db_session.commit()
+
+
+import asyncio
+
+from app.repository import freight_repo
+
+
+class _CapturingAsyncSession:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, stmt, params):
+        self.calls.append((str(stmt), params))
+        return self
+
+    def all(self):
+        return []
+
+
+def test_freight_results_tag_filter_is_case_insensitive():
+    db = _CapturingAsyncSession()
+    asyncio.run(freight_repo.fetch_freight_results_page(
+        db, sku_prefix=None, tags=[" Sale ", "NEW"], shipping_types=None, page=1, page_size=20,
+    ))
+
+    sql, params = db.calls[0]
+    assert params["tags"] == ["sale", "new"]
+    assert "lower(elem.tag_value) = ANY(CAST(:tags AS text[]))" in sql
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.repository.kogan_template_repo import iter_export_job_file_chunks
+
+
+class _FakeAsyncSession:
+    """按 substring(file_content, start, length) 的参数切片，模拟 Postgres 的 bytea 分块读取"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.calls = []
+
+    async def scalar(self, stmt):
+        params = stmt.compile().params
+        start, length = (v for k, v in params.items() if k.startswith("substring"))
+        self.calls.append((start, length))
+        return self.content[start - 1:start - 1 + length]
+
+
+def _collect(db, **kwargs):
+    async def _run():
+        return [chunk async for chunk in iter_export_job_file_chunks(db, "job-1", **kwargs)]
+    return asyncio.run(_run())
+
+
+def test_iter_export_job_file_chunks_reads_in_fixed_size_slices():
+    content = bytes(range(256)) * 600        # 153_600 字节
+    db = _FakeAsyncSession(content)
+
+    chunks = _collect(db, total_bytes=len(content), chunk_size=64 * 1024)
+
+    assert b"".join(chunks) == content
+    assert [len(c) for c in chunks] == [65536, 65536, 22528]
+    assert db.calls == [(1, 65536), (65537, 65536), (131073, 65536)]
+
+
+def test_iter_export_job_file_chunks_stops_when_row_disappears():
+    db = _FakeAsyncSession(b"")
+
+    assert _collect(db, total_bytes=10, chunk_size=4) == []
+
+
+def test_export_job_entity_load_skips_file_content():
+    from sqlalchemy import select
+    from app.db.model.kogan_export_job import KoganExportJob
+
+    sql = str(select(KoganExportJob))
+
+    assert "file_content" not in sql
+    assert "kogan_export_jobs.file_name" in sql
@@ -0,0 +1,56 @@
+import csv
+import io
+
+from app.repository import product_repo
+from app.repository.product_repo import (
+    _PRODUCT_CSV_HEADERS,
+    _PRODUCT_EXPORT_COLUMNS,
+    export_products_csv_iter,
+)
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def partitions(self):
+        yield self._rows
+
+
+class _FakeSession:
+    def __init__(self, rows, calls):
+        self._rows = rows
+        self._calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._calls.append("closed")
+
+    def execute(self, stmt, params, execution_options=None):
+        self._calls.append(execution_options)
+        return _FakeResult(self._rows)
+
+
+def _db_row(**values):
+    return tuple(values.get(col) for col in _PRODUCT_EXPORT_COLUMNS)
+
+
+def test_export_streams_with_own_session_and_formats_tags(monkeypatch):
+    calls = []
+    rows = [_db_row(sku_code="V201-A", price=1.5, product_tags=["a", " b "])]
+    monkeypatch.setattr(product_repo, "SessionLocal", lambda: _FakeSession(rows, calls))
+
+    gen = export_products_csv_iter(sku_prefix="V201-")
+    header = next(gen)
+    # 表头先发出，此时还没开会话
+    assert calls == []
+
+    body = header + "".join(gen)
+    parsed = list(csv.reader(io.StringIO(body)))
+    assert parsed[0] == list(_PRODUCT_CSV_HEADERS)
+    assert parsed[1][_PRODUCT_EXPORT_COLUMNS.index("sku_code")] == "V201-A"
+    assert parsed[1][_PRODUCT_EXPORT_COLUMNS.index("product_tags")] == "a,b"
+    assert calls[0]["stream_results"] is True and calls[0]["yield_per"] > 0
+    assert calls[-1] == "closed"
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+from app.repository.product_repo import fetch_products_page
+
+
+class _CapturingSession:
+    def __init__(self, rows):
+        self._rows = rows
+        self.calls = []
+
+    def execute(self, stmt, params):
+        self.calls.append((str(stmt), params))
+        return self
+
+    def mappings(self):
+        return self._rows
+
+    def scalar_one(self):
+        return 0
+
+
+def test_cursor_page_seeks_past_cursor_without_offset_or_total():
+    ts = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    db = _CapturingSession([{"sku_code": "B"}])
+
+    rows, total = fetch_products_page(
+        db, sku_prefix=None, tags=None, page=9, page_size=20, cursor=(ts, "A"),
+    )
+
+    sql, params = db.calls[0]
+    assert "(updated_at, sku_code) < (:cur_ts, :cur_sku)" in sql
+    assert "ORDER BY updated_at DESC, sku_code DESC" in sql
+    assert "OVER()" not in sql
+    assert params["offset"] == 0 and params["limit"] == 21
+    assert params["cur_ts"] == ts and params["cur_sku"] == "A"
+    assert rows == [{"sku_code": "B"}] and total is None
+
+
+def test_offset_page_reads_total_from_window_column():
+    db = _CapturingSession([{"sku_code": "A", "total_count": 5}])
+
+    rows, total = fetch_products_page(db, sku_prefix=None, tags=None, page=1, page_size=20)
+
+    assert total == 5
+    assert rows == [{"sku_code": "A"}]
+    assert "COUNT(*) OVER()" in db.calls[0][0]
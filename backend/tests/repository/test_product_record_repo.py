@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.product_sync_records import ProductSyncChunkOut, ProductSyncRunOut
+from app.repository.product_record_repo import (
+    fetch_product_sync_chunks_page,
+    fetch_product_sync_runs_page,
+)
+
+
+class _CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    def scalar(self, stmt):
+        return 0
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return self
+
+    def all(self):
+        return []
+
+
+def _selected_columns(stmt):
+    names = [c.name for c in stmt.selected_columns]
+    # 最后一列是 COUNT(*) OVER() 的总数
+    assert names[-1] == "total_count"
+    return names[:-1]
+
+
+def test_chunks_page_selects_exactly_the_response_fields():
+    db = _CapturingSession()
+    fetch_product_sync_chunks_page(db, page=1, page_size=20)
+
+    stmt = db.statements[0]
+    assert _selected_columns(stmt) == list(ProductSyncChunkOut.model_fields)
+    assert "sku_codes" not in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_runs_page_selects_exactly_the_response_fields():
+    db = _CapturingSession()
+    fetch_product_sync_runs_page(db, page=1, page_size=20)
+
+    assert _selected_columns(db.statements[0]) == list(ProductSyncRunOut.model_fields)
+
+
+class _RowsSession(_CapturingSession):
+    def __init__(self, rows, count):
+        super().__init__()
+        self._rows = rows
+        self._count = count
+        self.counts = 0
+
+    def scalar(self, stmt):
+        self.counts += 1
+        return self._count
+
+    def all(self):
+        return self._rows
+
+
+def test_page_total_comes_from_window_column_without_count_query():
+    row = SimpleNamespace(total_count=42)
+    db = _RowsSession([row], count=999)
+
+    _, total = fetch_product_sync_runs_page(db, page=1, page_size=20)
+
+    assert total == 42
+    assert db.counts == 0
+
+
+def test_page_past_the_end_falls_back_to_count_query():
+    db = _RowsSession([], count=7)
+
+    _, total = fetch_product_sync_chunks_page(db, page=3, page_size=20)
+
+    assert total == 7
+    assert db.counts == 1
+
+    db = _RowsSession([], count=7)
+    _, total = fetch_product_sync_chunks_page(db, page=1, page_size=20)
+    assert total == 0 and db.counts == 0
+
+
+def test_chunk_sku_lists_are_selected_as_json_text():
+    db = _CapturingSession()
+    fetch_product_sync_chunks_page(db, page=1, page_size=20)
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "CAST(product_sync_chunks.dsz_missing_sku_list AS TEXT)" in sql
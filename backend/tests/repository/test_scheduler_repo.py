@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repository import scheduler_repo as repo
+
+
+class _FakeSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def scalars(self, stmt, execution_options=None):
+        self.statements.append(stmt)
+        return self
+
+    def one(self):
+        return "row"
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_upsert_is_a_single_insert_on_conflict_returning():
+    db = _FakeSession()
+    dto = repo.ScheduleUpsertDTO(enabled=True, day_of_week="WED", hour=20, minute=0)
+
+    assert repo.upsert(db, "price_reset", dto) == "row"
+
+    (stmt,) = db.statements
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO schedules")
+    assert "ON CONFLICT (key) DO UPDATE SET enabled = excluded.enabled" in sql
+    assert "created_at = excluded" not in sql
+    assert "RETURNING" in sql
+    assert db.commits == 1
+
+
+def test_upsert_validates_before_touching_db():
+    db = _FakeSession()
+    dto = repo.ScheduleUpsertDTO(enabled=True, day_of_week="XYZ", hour=20, minute=0)  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError):
+        repo.upsert(db, "price_reset", dto)
+    assert db.statements == []
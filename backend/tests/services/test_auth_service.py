@@ -0,0 +1,27 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import auth_service as service
+
+
+class _FakeAsyncSession:
+    def __init__(self, user):
+        self._user = user
+        self.log = []
+
+    async def get(self, model, pk):
+        self.log.append(("get", pk))
+        return self._user
+
+    async def commit(self):
+        self.log.append("commit")
+
+
+def test_get_current_user_releases_connection_after_lookup(monkeypatch):
+    monkeypatch.setattr(service, "decode_token", lambda raw: {"user_id": 7})
+    user = SimpleNamespace(id=7, username="u", is_active=True)
+    db = _FakeAsyncSession(user)
+    request = SimpleNamespace(cookies={service.COOKIE_NAME: "tok"}, headers={}, client=None)
+
+    assert asyncio.run(service.get_current_user(request, db)) is user
+    assert db.log == [("get", 7), "commit"]
@@ -0,0 +1,110 @@
+import asyncio
+
+from app.services.freight import freight_export
+from app.services.freight.freight_export import (
+    _CSV_HEADERS,
+    _EXPORT_COLUMN_KEYS,
+    _build_where_sql_for_export,
+    _export_row,
+)
+
+
+def _db_row(**overrides):
+    row = [None] * len(_EXPORT_COLUMN_KEYS)
+    for key, value in overrides.items():
+        row[_EXPORT_COLUMN_KEYS.index(key)] = value
+    return tuple(row)
+
+
+def test_export_row_keeps_column_order_and_formats_tags():
+    # updated_at 已由 SQL 的 to_char 格式化，原样透传
+    row = _db_row(
+        sku_code="V201-A",
+        weight=1.5,
+        product_tags=["a", " b ", ""],
+        updated_at="2025-01-02T03:04:05+10:00",
+    )
+
+    out = _export_row(row)
+
+    assert len(out) == len(_CSV_HEADERS)
+    assert out[_EXPORT_COLUMN_KEYS.index("sku_code")] == "V201-A"
+    assert out[_EXPORT_COLUMN_KEYS.index("weight")] == 1.5
+    assert out[_EXPORT_COLUMN_KEYS.index("product_tags")] == "a,b"
+    assert out[_EXPORT_COLUMN_KEYS.index("updated_at")] == "2025-01-02T03:04:05+10:00"
+
+
+def test_build_where_sql_for_export_binds_every_filter():
+    where_sql, params = _build_where_sql_for_export("V201-", "tag1, tag2", "1, Extra2")
+
+    assert "f.shipping_type IN" in where_sql
+    assert "?|" in where_sql
+    assert params["st0"] == "1" and params["st1"] == "Extra2"
+    assert params["tag0"] == "tag1" and params["tag1"] == "tag2"
+    assert "lower(f.sku_code) LIKE :sku" in where_sql
+    assert params["sku"] == "v201-%"
+
+
+def test_build_where_sql_for_export_escapes_like_wildcards():
+    _, params = _build_where_sql_for_export("A_1%", None, None)
+
+    assert params["sku"] == "a\\_1\\%%"
+
+
+class _FakeStreamResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    async def partitions(self):
+        for idx in range(0, len(self._rows), 2):
+            yield self._rows[idx:idx + 2]
+
+
+class _FakeAsyncSession:
+    def __init__(self, rows):
+        self._rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement, params=None, execution_options=None):
+        assert execution_options == {"yield_per": freight_export._EXPORT_FETCH_ROWS}
+        return _FakeStreamResult(self._rows)
+
+
+def _collect_export(monkeypatch, rows, flush_bytes):
+    monkeypatch.setattr(freight_export, "AsyncSessionLocal", lambda: _FakeAsyncSession(rows))
+
+    async def run():
+        return [
+            chunk
+            async for chunk in freight_export.export_freight_csv_iter(
+                sku_prefix=None, tags_csv=None, shipping_types_csv=None, flush_bytes=flush_bytes,
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def test_export_streams_header_then_batched_chunks(monkeypatch):
+    rows = [_db_row(sku_code=f"SKU-{idx}") for idx in range(5)]
+
+    chunks = _collect_export(monkeypatch, rows, flush_bytes=1)
+
+    assert chunks[0].startswith("Sku,")
+    # 每个 partition（2 行）一块 + 头
+    assert len(chunks) == 4
+    body = "".join(chunks[1:]).splitlines()
+    assert [line.split(",")[0] for line in body] == [f"SKU-{idx}" for idx in range(5)]
+
+
+def test_export_buffers_small_output_into_one_tail_chunk(monkeypatch):
+    rows = [_db_row(sku_code=f"SKU-{idx}") for idx in range(5)]
+
+    chunks = _collect_export(monkeypatch, rows, flush_bytes=64 * 1024)
+
+    assert len(chunks) == 2
+    assert len(chunks[1].splitlines()) == 5
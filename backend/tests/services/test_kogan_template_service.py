@@ -0,0 +1,43 @@
+import asyncio
+import gzip
+
+from app.services import kogan_template_service as service
+
+
+class _FakeSessionContext:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _collect(job_id, total_bytes, **kwargs):
+    async def _run():
+        return [chunk async for chunk in service.iter_export_job_file(job_id, total_bytes, **kwargs)]
+    return asyncio.run(_run())
+
+
+def test_iter_export_job_file_gunzips_across_chunk_boundaries(monkeypatch):
+    csv_bytes = b"".join(b"SKU-%05d,12.34\n" % i for i in range(5000))
+    stored = gzip.compress(csv_bytes, mtime=0)
+
+    async def _fake_chunks(db, job_id, *, total_bytes, chunk_size):
+        for start in range(0, total_bytes, chunk_size):
+            yield stored[start:start + chunk_size]
+
+    monkeypatch.setattr(service, "AsyncSessionLocal", _FakeSessionContext)
+    monkeypatch.setattr(service, "iter_export_job_file_chunks", _fake_chunks)
+
+    raw = _collect("job-1", len(stored), chunk_size=1024)
+    plain = _collect("job-1", len(stored), chunk_size=1024, gunzip=True)
+
+    assert b"".join(raw) == stored
+    assert b"".join(plain) == csv_bytes
+
+
+def test_country_csv_layout_follows_column_specs():
+    for country, specs in service.COUNTRY_COLUMN_SPECS.items():
+        headers, keys = service._COUNTRY_CSV_LAYOUT[country]
+        assert headers == tuple(col.header for col in specs)
+        assert keys == tuple(col.logical_key for col in specs)
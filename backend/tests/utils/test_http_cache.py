@@ -0,0 +1,28 @@
+from app.utils.http_cache import accepts_encoding, etag_matches, weak_etag
+
+
+def test_weak_etag_is_stable_and_content_based():
+    assert weak_etag(b'["1","10"]') == weak_etag(b'["1","10"]')
+    assert weak_etag(b'["1","10"]') != weak_etag(b'["1"]')
+    assert weak_etag(b"x").startswith('W/"')
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = weak_etag(b"payload")
+    strong = etag.removeprefix("W/")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(strong, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_accepts_encoding_honours_q_values_and_wildcard():
+    assert accepts_encoding("gzip, deflate, br", "gzip")
+    assert accepts_encoding("br;q=1.0, GZIP;q=0.5", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("gzip;q=0, *", "gzip")
+    assert not accepts_encoding("identity", "gzip")
+    assert not accepts_encoding(None, "gzip")